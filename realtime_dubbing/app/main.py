@@ -21,7 +21,7 @@ from models.audio_models import (
 )
 from utils.audio_processing import AudioProcessingPipeline
 from config.settings import settings
-from app.voice_management_api import router as voice_management_router
+from app.voice_management_api import router as voice_management_router, voice_management
 
 # Configure logging
 logging.basicConfig(
@@ -54,6 +54,8 @@ app.include_router(voice_management_router)
 
 # Global instances
 audio_pipeline = AudioProcessingPipeline()
+# Actor edits made through the REST API change which voice the pipeline should pick
+voice_management.add_update_listener(audio_pipeline.invalidate_voices)
 active_connections: Dict[str, WebSocket] = {}
 
 class ConnectionManager:
@@ -379,7 +381,7 @@ async def handle_get_session_info(session_id: str, connection_id: str):
     """Handle get session info request."""
     try:
         session_info = audio_pipeline.get_session_info(session_id)
-        speaker_profiles = audio_pipeline.get_speaker_profiles(session_id)
+        speaker_profiles = await audio_pipeline.get_speaker_profiles(session_id)
         
         await manager.send_personal_message({
             "type": "session_info",
@@ -462,12 +464,19 @@ async def get_session(session_id: str):
     if not session_info:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    speaker_profiles = audio_pipeline.get_speaker_profiles(session_id)
+    speaker_profiles = await audio_pipeline.get_speaker_profiles(session_id)
     return {
         **session_info,
         "speaker_profiles": speaker_profiles
     }
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Persist speaker profiles and stop the speaker service's background workers."""
+    speaker_service = audio_pipeline.speaker_service
+    await asyncio.to_thread(speaker_service.flush_profiles)
+    await asyncio.to_thread(speaker_service.shutdown)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -13,6 +13,7 @@ class Settings(BaseSettings):
     # API Keys (OpenAI no longer needed for local Whisper)
     # openai_api_key: Optional[str] = None  # Removed - using local Whisper now
     elevenlabs_api_key: Optional[str] = None
+    huggingface_token: Optional[str] = None  # Required for gated pyannote models
     
     # Redis Configuration
     redis_host: str = "localhost"
@@ -32,6 +33,9 @@ class Settings(BaseSettings):
     # Performance Configuration
     max_concurrent_requests: int = 10
     cache_ttl: int = 3600  # seconds
+    speaker_embedding_workers: int = 4  # processes for batch speaker embedding extraction
+    session_ttl: int = 3600  # seconds a session's state is kept after its last activity
+    max_active_sessions: int = 10000
     
     # Voice Management Configuration
     voice_library_dir: str = "data/voice_library"
@@ -48,9 +52,11 @@ class Settings(BaseSettings):
     # Local Whisper Configuration (completely free)
     whisper_model: str = "base"  # Options: tiny, base, small, medium, large
     whisper_language: Optional[str] = None  # Auto-detect if None
+    whisper_compile_encoder: bool = True  # torch.compile the encoder (GPU only)
+    whisper_quantize_cpu: bool = True  # int8 dynamic quantization of Linear layers (CPU only)
     
     # Speaker Diarization Configuration
-    max_speakers: int = 5
+    max_speakers: int = 5  # Upper bound passed to the diarization clustering step
     diarization_model: str = "pyannote/speaker-diarization-3.1"
     speaker_embedding_model: str = "pyannote/embedding"
     
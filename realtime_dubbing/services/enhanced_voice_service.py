@@ -16,6 +16,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from models.audio_models import VoiceSynthesisResult, AudioFormat, SpeakerProfile, AudioChunk
 from config.settings import settings
+from utils.wav_io import int16_wav_bytes
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +36,14 @@ class VoiceClone:
 class EnhancedVoiceService:
     """Enhanced voice synthesis and cloning service with voice quality optimization."""
     
+    DEFAULT_VOICE_ID = "pNInz6obpgDQGcFmaJgB"  # Adam (male)
+    FEMALE_VOICE_ID = "21m00Tcm4TlvDq8ikWAM"  # Rachel (female)
+    
+    # Synthesis is requested as raw 16-bit mono PCM and wrapped as WAV, so the
+    # pipeline can trim it without decoding MP3
+    OUTPUT_FORMAT = "pcm_16000"
+    OUTPUT_SAMPLE_RATE = 16000
+    
     def __init__(self, voice_library_dir: str = "data/voice_library"):
         self.client = ElevenLabs(api_key=settings.elevenlabs_api_key)
         
@@ -133,6 +142,7 @@ class EnhancedVoiceService:
                 voice=target_voice_id,
                 voice_settings=voice_settings,
                 model="eleven_multilingual_v2",
+                output_format=self.OUTPUT_FORMAT,
                 stream=True
             )
             
@@ -142,14 +152,14 @@ class EnhancedVoiceService:
                 if chunk:
                     audio_chunks.append(chunk)
             
-            # Combine audio data
-            audio_data = b''.join(audio_chunks)
+            # Combine audio data into whole 16-bit samples
+            pcm = b''.join(audio_chunks)
+            samples = np.frombuffer(pcm, dtype='<i2', count=len(pcm) // 2)
             
-            # Calculate duration (approximate)
-            duration = len(audio_data) / (settings.sample_rate * 2)  # 16-bit audio
+            duration = len(samples) / self.OUTPUT_SAMPLE_RATE
             
             return VoiceSynthesisResult(
-                audio_data=audio_data,
+                audio_data=int16_wav_bytes(samples, self.OUTPUT_SAMPLE_RATE),
                 format=AudioFormat.WAV,
                 duration=duration,
                 voice_id=target_voice_id
@@ -303,12 +313,12 @@ class EnhancedVoiceService:
             gender_likelihood = speaker_profile.characteristics["gender_likelihood"]
             
             if gender_likelihood < 0.3:  # Likely male
-                return "pNInz6obpgDQGcFmaJgB"  # Adam (male)
+                return self.DEFAULT_VOICE_ID
             elif gender_likelihood > 0.7:  # Likely female
-                return "21m00Tcm4TlvDq8ikWAM"  # Rachel (female)
+                return self.FEMALE_VOICE_ID
         
         # Default voice if all else fails
-        return "pNInz6obpgDQGcFmaJgB"  # Adam
+        return self.DEFAULT_VOICE_ID
     
     async def get_available_voices(self, include_library: bool = True) -> Dict[str, Any]:
         """Get list of available voices, including voice library."""
@@ -2,143 +2,260 @@ import numpy as np
 import librosa
 from typing import Dict, List, Optional, Tuple
 from sklearn.cluster import DBSCAN
-from sklearn.metrics.pairwise import cosine_similarity
 import logging
+import functools
+import heapq
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+try:
+    import faiss
+except ImportError:  # optional: matching falls back to a NumPy product
+    faiss = None
+
 from models.audio_models import SpeakerProfile, AudioChunk
 from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+
+@functools.lru_cache(maxsize=4)
+def _frontend_plan(sample_rate: int, n_fft: int = 2048) -> Tuple[np.ndarray, np.ndarray]:
+    """STFT window and mel filterbank for a sample rate, built once and shared read-only."""
+    window = librosa.filters.get_window('hann', n_fft, fftbins=True)
+    mel_basis = librosa.filters.mel(sr=sample_rate, n_fft=n_fft)
+    window.flags.writeable = False
+    mel_basis.flags.writeable = False
+    return window, mel_basis
+
+
 class SpeakerIdentificationService:
     """Service for identifying and tracking speakers across audio."""
     
+    # 13 MFCC means + 13 MFCC stds + centroid, rolloff, bandwidth, ZCR and pitch
+    EMBEDDING_DIM = 31
+    
+    # Observations kept per speaker, and the weight of recency in their score
+    PROTOTYPE_CACHE_SIZE = 5
+    RECENCY_WEIGHT = 0.3
+    
     def __init__(self):
-        self.speaker_profiles: Dict[str, SpeakerProfile] = {}
-        self.speaker_embeddings: List[np.ndarray] = []
+        # Speakers are stored as parallel columns indexed by row (structure of arrays);
+        # SpeakerProfile objects are only built on request, as views of these rows
         self.speaker_ids: List[str] = []
+        self.id_to_index: Dict[str, int] = {}
+        
+        # Contiguous float32 row per speaker (grown by doubling) so matching searches
+        # the registry in place instead of stacking it on every call
+        self._embedding_buffer = np.empty((16, self.EMBEDDING_DIM), dtype=np.float32)
+        self._confidence_buffer = np.empty(16)
+        self._characteristics: List[Dict[str, float]] = []
+        self._voice_clone_ids: List[Optional[str]] = []
         self.similarity_threshold = settings.voice_similarity_threshold
+        
+        # Per-speaker (duration, observation index, embedding) prototypes; each speaker's
+        # row in speaker_embeddings is the score-weighted centroid of its prototypes
+        self._prototype_cache: Dict[str, List[Tuple[float, int, np.ndarray]]] = {}
+        self._observation_count = 0
+    
+    @property
+    def speaker_embeddings(self) -> np.ndarray:
+        """Embeddings of all enrolled speakers, one row per speaker."""
+        return self._embedding_buffer[:len(self.speaker_ids)]
     
     def extract_speaker_embedding(self, audio_chunk: AudioChunk) -> np.ndarray:
         """Extract speaker embedding from audio chunk using librosa features."""
         try:
-            # Extract various audio features that characterize speaker identity
-            
-            # MFCC features (Mel-frequency cepstral coefficients)
-            mfccs = librosa.feature.mfcc(
-                y=audio_chunk.data, 
-                sr=audio_chunk.sample_rate, 
-                n_mfcc=13
-            )
-            mfcc_mean = np.mean(mfccs, axis=1)
-            mfcc_std = np.std(mfccs, axis=1)
-            
-            # Spectral features
-            spectral_centroids = librosa.feature.spectral_centroid(y=audio_chunk.data, sr=audio_chunk.sample_rate)
-            spectral_rolloff = librosa.feature.spectral_rolloff(y=audio_chunk.data, sr=audio_chunk.sample_rate)
-            spectral_bandwidth = librosa.feature.spectral_bandwidth(y=audio_chunk.data, sr=audio_chunk.sample_rate)
-            
-            # Zero crossing rate
-            zcr = librosa.feature.zero_crossing_rate(audio_chunk.data)
-            
-            # Pitch features
-            pitches, magnitudes = librosa.piptrack(y=audio_chunk.data, sr=audio_chunk.sample_rate)
-            pitch_mean = np.mean(pitches[pitches > 0]) if np.any(pitches > 0) else 0
-            
-            # Combine all features into a single embedding vector
-            embedding = np.concatenate([
-                mfcc_mean,
-                mfcc_std,
-                [np.mean(spectral_centroids)],
-                [np.mean(spectral_rolloff)],
-                [np.mean(spectral_bandwidth)],
-                [np.mean(zcr)],
-                [pitch_mean]
-            ])
-            
-            # Normalize the embedding
-            embedding = embedding / (np.linalg.norm(embedding) + 1e-8)
-            
-            return embedding
+            data = audio_chunk.data[np.newaxis]
+            return self._extract_embeddings(data, audio_chunk.sample_rate)[0]
             
         except Exception as e:
             logger.error(f"Error extracting speaker embedding: {e}")
             # Return zero embedding as fallback
-            return np.zeros(29)  # 13 + 13 + 1 + 1 + 1 + 1 + 1
+            return np.zeros(self.EMBEDDING_DIM)
+    
+    def extract_speaker_embeddings(self, audio_chunks: List[AudioChunk]) -> np.ndarray:
+        """Extract embeddings for several chunks, one row per chunk.
+        
+        Chunks of the same length and sample rate go through a single vectorized
+        librosa pass; anything else is extracted chunk by chunk.
+        """
+        shapes = {(chunk.sample_rate, len(chunk.data)) for chunk in audio_chunks}
+        if len(shapes) == 1:
+            try:
+                data = np.stack([chunk.data for chunk in audio_chunks])
+                return self._extract_embeddings(data, audio_chunks[0].sample_rate)
+            except Exception as e:
+                logger.error(f"Error extracting batched speaker embeddings: {e}")
+        return np.array([self.extract_speaker_embedding(chunk) for chunk in audio_chunks])
+    
+    def _extract_embeddings(self, data: np.ndarray, sample_rate: int) -> np.ndarray:
+        """Embeddings for a (batch, samples) array of equal-length signals.
+        
+        Features are pooled per signal, so each row matches extracting that signal alone.
+        """
+        # Extract various audio features that characterize speaker identity
+        
+        # One magnitude STFT shared by the MFCC, spectral and pitch features; the window
+        # and mel filterbank come from the per-sample-rate plan instead of being rebuilt
+        window, mel_basis = _frontend_plan(sample_rate)
+        S = np.abs(librosa.stft(data, window=window))
+        
+        # MFCC features (Mel-frequency cepstral coefficients); the 80 dB floor is
+        # applied per signal, as mfcc(y=...) does for a single one
+        mel = np.einsum("...ft,mf->...mt", S**2, mel_basis, optimize=True)
+        mel_db = librosa.power_to_db(mel, top_db=None)
+        mel_db = np.maximum(mel_db, mel_db.max(axis=(-2, -1), keepdims=True) - 80.0)
+        mfccs = librosa.feature.mfcc(S=mel_db, n_mfcc=13)
+        mfcc_mean = np.mean(mfccs, axis=-1)
+        mfcc_std = np.std(mfccs, axis=-1)
+        
+        # Spectral features
+        spectral_centroids = librosa.feature.spectral_centroid(S=S, sr=sample_rate)
+        spectral_rolloff = librosa.feature.spectral_rolloff(S=S, sr=sample_rate)
+        spectral_bandwidth = librosa.feature.spectral_bandwidth(S=S, sr=sample_rate)
+        
+        # Zero crossing rate
+        zcr = librosa.feature.zero_crossing_rate(data)
+        
+        # Pitch features
+        pitches, magnitudes = librosa.piptrack(S=S, sr=sample_rate)
+        pitch_mean = np.array([
+            np.mean(p[p > 0]) if np.any(p > 0) else 0 for p in pitches
+        ])
+        
+        # Combine all features into a single embedding vector per signal
+        embeddings = np.column_stack([
+            mfcc_mean,
+            mfcc_std,
+            np.mean(spectral_centroids, axis=(-2, -1)),
+            np.mean(spectral_rolloff, axis=(-2, -1)),
+            np.mean(spectral_bandwidth, axis=(-2, -1)),
+            np.mean(zcr, axis=(-2, -1)),
+            pitch_mean
+        ])
+        
+        # Normalize the embeddings
+        return embeddings / (np.linalg.norm(embeddings, axis=1, keepdims=True) + 1e-8)
     
     def identify_speaker(self, audio_chunk: AudioChunk) -> Optional[str]:
         """Identify speaker from audio chunk."""
         try:
             # Extract embedding for the current audio
             current_embedding = self.extract_speaker_embedding(audio_chunk)
-            
-            if len(self.speaker_embeddings) == 0:
-                # First speaker
-                speaker_id = f"speaker_001"
-                self._add_new_speaker(speaker_id, current_embedding, audio_chunk)
-                return speaker_id
-            
-            # Calculate similarity with existing speakers
-            similarities = []
-            for existing_embedding in self.speaker_embeddings:
-                similarity = cosine_similarity(
-                    current_embedding.reshape(1, -1),
-                    existing_embedding.reshape(1, -1)
-                )[0][0]
-                similarities.append(similarity)
-            
-            # Find best match
-            max_similarity = max(similarities)
-            best_match_idx = similarities.index(max_similarity)
-            
-            if max_similarity >= self.similarity_threshold:
-                # Match found
-                speaker_id = self.speaker_ids[best_match_idx]
-                self._update_speaker_profile(speaker_id, current_embedding)
-                return speaker_id
-            else:
-                # New speaker
-                speaker_id = f"speaker_{len(self.speaker_embeddings) + 1:03d}"
-                self._add_new_speaker(speaker_id, current_embedding, audio_chunk)
-                return speaker_id
+            return self.match_embedding(current_embedding, audio_chunk)
                 
         except Exception as e:
             logger.error(f"Error identifying speaker: {e}")
             return None
     
+    def identify_speakers_batch(self, audio_chunks: List[AudioChunk]) -> List[Optional[str]]:
+        """Identify speakers for several chunks with one feature-extraction pass.
+        
+        Matching still runs chunk by chunk in order, since a chunk that enrolls a
+        new speaker changes what the following chunks are compared against.
+        """
+        try:
+            embeddings = self.extract_speaker_embeddings(audio_chunks)
+            return [
+                self.match_embedding(embedding, audio_chunk)
+                for embedding, audio_chunk in zip(embeddings, audio_chunks)
+            ]
+        except Exception as e:
+            logger.error(f"Error identifying speakers: {e}")
+            return [None] * len(audio_chunks)
+    
+    def match_embedding(self, current_embedding: np.ndarray, audio_chunk: AudioChunk) -> str:
+        """Assign an embedding to the most similar known speaker or enroll a new one."""
+        if len(self.speaker_embeddings) == 0:
+            # First speaker
+            speaker_id = f"speaker_001"
+            self._add_new_speaker(speaker_id, current_embedding, audio_chunk)
+            return speaker_id
+        
+        # Cosine similarity with all existing speakers (embeddings are unit norm); faiss
+        # runs the exact inner-product search over the registry rows without copying them
+        query = np.asarray(current_embedding, dtype=np.float32)
+        if faiss is not None:
+            similarities, indices = faiss.knn(
+                query[np.newaxis], self.speaker_embeddings, 1, metric=faiss.METRIC_INNER_PRODUCT
+            )
+            best_match_idx = int(indices[0, 0])
+            max_similarity = float(similarities[0, 0])
+        else:
+            similarities = self.speaker_embeddings @ query
+            best_match_idx = int(np.argmax(similarities))
+            max_similarity = float(similarities[best_match_idx])
+        
+        if max_similarity >= self.similarity_threshold:
+            # Match found
+            self._update_speaker_profile(best_match_idx, current_embedding, audio_chunk)
+            return self.speaker_ids[best_match_idx]
+        else:
+            # New speaker
+            speaker_id = f"speaker_{len(self.speaker_embeddings) + 1:03d}"
+            self._add_new_speaker(speaker_id, current_embedding, audio_chunk)
+            return speaker_id
+    
     def _add_new_speaker(self, speaker_id: str, embedding: np.ndarray, audio_chunk: AudioChunk):
         """Add a new speaker to the tracking system."""
-        # Create speaker profile
         characteristics = self._analyze_voice_characteristics(audio_chunk)
         
-        profile = SpeakerProfile(
-            speaker_id=speaker_id,
-            voice_embedding=embedding,
-            confidence=1.0,
-            characteristics=characteristics
-        )
-        
-        # Store in tracking lists
-        self.speaker_profiles[speaker_id] = profile
-        self.speaker_embeddings.append(embedding)
+        # Store in the speaker columns
+        index = len(self.speaker_ids)
+        if index == len(self._embedding_buffer):
+            self._embedding_buffer = self._grow(self._embedding_buffer, 2 * index)
+            self._confidence_buffer = self._grow(self._confidence_buffer, 2 * index)
+        self._embedding_buffer[index] = embedding
+        self._confidence_buffer[index] = 1.0
+        self._characteristics.append(characteristics)
+        self._voice_clone_ids.append(None)
         self.speaker_ids.append(speaker_id)
+        self.id_to_index[speaker_id] = index
+        self._prototype_cache[speaker_id] = []
+        self._cache_observation(index, embedding, audio_chunk)
         
         logger.info(f"Added new speaker: {speaker_id}")
     
-    def _update_speaker_profile(self, speaker_id: str, new_embedding: np.ndarray):
-        """Update existing speaker profile with new embedding."""
-        if speaker_id in self.speaker_profiles:
-            profile = self.speaker_profiles[speaker_id]
-            
-            # Exponential moving average for embedding update
-            alpha = 0.1  # Learning rate
-            profile.voice_embedding = (1 - alpha) * profile.voice_embedding + alpha * new_embedding
-            
-            # Update confidence (simplified)
-            profile.confidence = min(1.0, profile.confidence + 0.05)
+    @staticmethod
+    def _grow(buffer: np.ndarray, capacity: int) -> np.ndarray:
+        """Return a copy of a full buffer with room for `capacity` rows."""
+        grown = np.empty((capacity,) + buffer.shape[1:], dtype=buffer.dtype)
+        grown[:len(buffer)] = buffer
+        return grown
+    
+    def _cache_observation(self, speaker_idx: int, embedding: np.ndarray, audio_chunk: AudioChunk):
+        """Keep a speaker's top observations by duration x recency and refresh its centroid.
+        
+        Each observation i of n is scored phi = duration * (1 + RECENCY_WEIGHT * i / n), so
+        long and recent segments win; matching then compares against one centroid per
+        speaker however long the session runs.
+        """
+        speaker_id = self.speaker_ids[speaker_idx]
+        self._observation_count += 1
+        n = self._observation_count
+        duration = len(audio_chunk.data) / audio_chunk.sample_rate
+        
+        def score(observation: Tuple[float, int, np.ndarray]) -> float:
+            return observation[0] * (1 + self.RECENCY_WEIGHT * observation[1] / n)
+        
+        prototypes = self._prototype_cache[speaker_id]
+        prototypes.append((duration, n, embedding))
+        prototypes = heapq.nlargest(self.PROTOTYPE_CACHE_SIZE, prototypes, key=score)
+        self._prototype_cache[speaker_id] = prototypes
+        
+        weights = np.array([score(observation) for observation in prototypes])
+        centroid = weights @ np.vstack([observation[2] for observation in prototypes])
+        self.speaker_embeddings[speaker_idx] = centroid / (np.linalg.norm(centroid) + 1e-8)
+    
+    def _update_speaker_profile(self, speaker_idx: int, new_embedding: np.ndarray, audio_chunk: AudioChunk):
+        """Update an existing speaker's row with a newly matched embedding."""
+        # The embedding row tracks the speaker's prototype centroid
+        self._cache_observation(speaker_idx, new_embedding, audio_chunk)
+        
+        # Update confidence (simplified)
+        self._confidence_buffer[speaker_idx] = min(1.0, self._confidence_buffer[speaker_idx] + 0.05)
     
     def _analyze_voice_characteristics(self, audio_chunk: AudioChunk) -> Dict[str, float]:
         """Analyze voice characteristics for speaker profiling."""
@@ -177,22 +294,40 @@ class SpeakerIdentificationService:
             return {}
     
     def get_speaker_profile(self, speaker_id: str) -> Optional[SpeakerProfile]:
-        """Get speaker profile by ID."""
-        return self.speaker_profiles.get(speaker_id)
+        """Get speaker profile by ID (its embedding is a view of the speaker's row)."""
+        index = self.id_to_index.get(speaker_id)
+        if index is None:
+            return None
+        return SpeakerProfile(
+            speaker_id=speaker_id,
+            voice_embedding=self._embedding_buffer[index],
+            confidence=float(self._confidence_buffer[index]),
+            characteristics=self._characteristics[index],
+            voice_clone_id=self._voice_clone_ids[index]
+        )
     
     def set_voice_clone_id(self, speaker_id: str, voice_clone_id: str):
         """Associate a voice clone ID with a speaker."""
-        if speaker_id in self.speaker_profiles:
-            self.speaker_profiles[speaker_id].voice_clone_id = voice_clone_id
+        if speaker_id in self.id_to_index:
+            self._voice_clone_ids[self.id_to_index[speaker_id]] = voice_clone_id
             logger.info(f"Associated voice clone {voice_clone_id} with speaker {speaker_id}")
     
     def get_all_speakers(self) -> Dict[str, SpeakerProfile]:
         """Get all tracked speakers."""
-        return self.speaker_profiles.copy()
+        return {speaker_id: self.get_speaker_profile(speaker_id) for speaker_id in self.speaker_ids}
     
     def reset_speakers(self):
         """Reset all speaker tracking data."""
-        self.speaker_profiles.clear()
-        self.speaker_embeddings.clear()
         self.speaker_ids.clear()
-        logger.info("Reset all speaker tracking data")
\ No newline at end of file
+        self.id_to_index.clear()
+        self._characteristics.clear()
+        self._voice_clone_ids.clear()
+        self._prototype_cache.clear()
+        self._observation_count = 0
+        logger.info("Reset all speaker tracking data")
+
+
+@functools.lru_cache(maxsize=1)
+def get_service() -> SpeakerIdentificationService:
+    """Shared SpeakerIdentificationService instance, created on first use."""
+    return SpeakerIdentificationService()
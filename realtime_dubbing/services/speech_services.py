@@ -30,6 +30,10 @@ class SpeechService:
     async def recognize_audio_chunk(self, audio_data: np.ndarray, language_code: str = "auto") -> SpeechRecognitionResult:
         """Recognize speech from a single audio chunk."""
         return await self.whisper_service.recognize_audio_chunk(audio_data, language_code)
+    
+    async def recognize_batch(self, audio_chunks: list[np.ndarray], language_code: str = "auto") -> list[SpeechRecognitionResult]:
+        """Recognize several audio chunks in one batched pass, results in input order."""
+        return await self.whisper_service.recognize_batch(audio_chunks, language_code)
 
 
 class TranslationService:
@@ -4,7 +4,7 @@ import os
 import sys
 import time
 import logging
-from typing import Dict, List, Optional, Set, Any, Tuple
+from typing import Callable, Dict, List, Optional, Set, Any, Tuple
 from pathlib import Path
 from dataclasses import dataclass
 import numpy as np
@@ -53,6 +53,9 @@ class VoiceManagementSystem:
         self.speaker_service = speaker_service or WSISpeakerIdentification()
         self.voice_service = voice_service or EnhancedVoiceService()
         
+        # Called with (speaker_id, actor_id) whenever an actor's voices or speakers change
+        self._update_listeners: List[Callable[[Optional[str], Optional[str]], None]] = []
+        
         # Load existing data
         self._load_actor_profiles()
     
@@ -121,6 +124,18 @@ class VoiceManagementSystem:
         except Exception as e:
             logger.error(f"Error saving actor profiles: {e}")
     
+    def add_update_listener(self, listener: Callable[[Optional[str], Optional[str]], None]):
+        """Register a callback for changes that can affect an actor's voice choice."""
+        self._update_listeners.append(listener)
+    
+    def _notify_update(self, speaker_id: Optional[str], actor_id: Optional[str]):
+        """Tell listeners that the voice choice for a speaker or actor may have changed."""
+        for listener in self._update_listeners:
+            try:
+                listener(speaker_id, actor_id)
+            except Exception as e:
+                logger.error(f"Error in voice management update listener: {e}")
+    
     async def create_actor_profile(self, name: str, speaker_ids: List[str] = None) -> str:
         """Create a new actor profile."""
         try:
@@ -184,6 +199,7 @@ class VoiceManagementSystem:
             
             # Save changes
             self._save_actor_profiles()
+            self._notify_update(speaker_id, actor_id)
             
             logger.info(f"Associated speaker {speaker_id} with actor {actor_id}")
             return True
@@ -207,6 +223,7 @@ class VoiceManagementSystem:
                 
                 # Save changes
                 self._save_actor_profiles()
+                self._notify_update(None, actor_id)
                 
                 logger.info(f"Added voice {voice_id} to actor {actor_id}")
                 return True
@@ -366,6 +383,7 @@ class VoiceManagementSystem:
             
             # Save changes
             self._save_actor_profiles()
+            self._notify_update(None, actor_id)
             
             logger.info(f"Updated metadata for actor {actor_id}")
             return True
@@ -2,6 +2,8 @@ import asyncio
 import aiohttp
 import io
 import json
+import time
+from pathlib import Path
 from typing import Optional, Dict, Any
 from elevenlabs import VoiceSettings, Voice, ElevenLabs
 from elevenlabs.client import ElevenLabs
@@ -19,15 +21,55 @@ logger = logging.getLogger(__name__)
 class ElevenLabsVoiceService:
     """ElevenLabs voice synthesis and cloning service."""
     
-    def __init__(self):
+    DEFAULT_VOICE_ID = "pNInz6obpgDQGcFmaJgB"  # Adam voice as default
+    VOICES_CACHE_TTL = 600  # seconds before the available-voices snapshot is refreshed
+    
+    def __init__(self, voice_library_dir: str = settings.voice_library_dir):
         self.client = ElevenLabs(api_key=settings.elevenlabs_api_key)
-        self.voice_cache: Dict[str, str] = {}  # speaker_id -> voice_id mapping
         self.default_voice_settings = VoiceSettings(
             stability=settings.voice_stability,
             similarity_boost=settings.voice_clarity,
             style=0.5,
             use_speaker_boost=True
         )
+        
+        # speaker_id -> voice_id mapping, persisted so restarts don't re-clone voices
+        self.voice_library_dir = Path(voice_library_dir)
+        self.voice_library_dir.mkdir(exist_ok=True, parents=True)
+        self.voice_cache: Dict[str, str] = {}
+        self._load_voice_cache()
+        
+        # Available voices snapshot (stale-while-revalidate)
+        self._voices_snapshot: Optional[Dict[str, Any]] = None
+        self._voices_fetched_at = 0.0
+        self._voices_refresh: Optional[asyncio.Task] = None
+    
+    def _load_voice_cache(self):
+        """Load the speaker -> voice mapping from disk."""
+        try:
+            cache_path = self.voice_library_dir / "voice_cache.json"
+            if cache_path.exists():
+                with open(cache_path, 'r') as f:
+                    self.voice_cache = json.load(f)
+                logger.info(f"Loaded {len(self.voice_cache)} cached speaker voices")
+        except Exception as e:
+            logger.error(f"Error loading voice cache: {e}")
+    
+    def _save_voice_cache(self):
+        """Atomically replace the speaker -> voice mapping on disk."""
+        try:
+            cache_path = self.voice_library_dir / "voice_cache.json"
+            tmp_path = self.voice_library_dir / "voice_cache.json.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self.voice_cache, f, indent=2)
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            logger.error(f"Error saving voice cache: {e}")
+    
+    def _cache_voice(self, speaker_id: str, voice_id: str):
+        """Record a speaker's voice clone and write it through to disk."""
+        self.voice_cache[speaker_id] = voice_id
+        self._save_voice_cache()
     
     async def synthesize_speech(self, text: str, voice_id: Optional[str] = None, speaker_profile: Optional[SpeakerProfile] = None) -> VoiceSynthesisResult:
         """Synthesize speech using ElevenLabs TTS."""
@@ -78,7 +120,7 @@ class ElevenLabsVoiceService:
             )
             
             # Cache the voice mapping
-            self.voice_cache[speaker_profile.speaker_id] = voice.voice_id
+            self._cache_voice(speaker_profile.speaker_id, voice.voice_id)
             
             logger.info(f"Successfully cloned voice for speaker {speaker_profile.speaker_id}: {voice.voice_id}")
             return voice.voice_id
@@ -88,10 +130,27 @@ class ElevenLabsVoiceService:
             raise
     
     async def get_available_voices(self) -> Dict[str, Any]:
-        """Get list of available voices."""
+        """Get list of available voices.
+        
+        The voice list rarely changes, so a cached snapshot is returned when one
+        exists; once it is older than VOICES_CACHE_TTL it is refreshed in the background.
+        """
+        if self._voices_snapshot is None:
+            return await self._refresh_available_voices()
+        
+        is_stale = time.time() - self._voices_fetched_at > self.VOICES_CACHE_TTL
+        if is_stale and (self._voices_refresh is None or self._voices_refresh.done()):
+            self._voices_refresh = asyncio.create_task(self._refresh_available_voices())
+            self._voices_refresh.add_done_callback(self._log_refresh_error)
+        
+        return self._voices_snapshot
+    
+    async def _refresh_available_voices(self) -> Dict[str, Any]:
+        """Fetch the voice list from ElevenLabs and update the cached snapshot."""
         try:
-            voices = self.client.voices.get_all()
-            return {
+            loop = asyncio.get_event_loop()
+            voices = await loop.run_in_executor(None, self.client.voices.get_all)
+            self._voices_snapshot = {
                 voice.voice_id: {
                     "name": voice.name,
                     "category": voice.category,
@@ -100,26 +159,37 @@ class ElevenLabsVoiceService:
                 }
                 for voice in voices.voices
             }
+            self._voices_fetched_at = time.time()
+            return self._voices_snapshot
         except Exception as e:
             logger.error(f"Error fetching voices: {e}")
             raise
     
+    @staticmethod
+    def _log_refresh_error(task: asyncio.Task):
+        """Keep background refresh failures from surfacing as unretrieved exceptions."""
+        if not task.cancelled() and task.exception():
+            logger.warning(f"Background voice list refresh failed: {task.exception()}")
+    
     def _get_voice_for_speaker(self, voice_id: Optional[str], speaker_profile: Optional[SpeakerProfile]) -> str:
         """Determine the appropriate voice ID for a speaker."""
-        # If specific voice_id provided, use it
+        # If specific voice_id provided, use it without touching the profile
         if voice_id:
             return voice_id
         
-        # If speaker profile with clone exists, use it
-        if speaker_profile and speaker_profile.voice_clone_id:
-            return speaker_profile.voice_clone_id
-        
-        # Check cache for speaker
-        if speaker_profile and speaker_profile.speaker_id in self.voice_cache:
-            return self.voice_cache[speaker_profile.speaker_id]
+        if speaker_profile is None:
+            return self.DEFAULT_VOICE_ID
         
-        # Default to a preset voice
-        return "pNInz6obpgDQGcFmaJgB"  # Adam voice as default
+        return self._pick(
+            speaker_profile.voice_clone_id,
+            self.voice_cache.get(speaker_profile.speaker_id),
+            self.DEFAULT_VOICE_ID
+        )
+    
+    @staticmethod
+    def _pick(clone_id: Optional[str], cached_id: Optional[str], default: str) -> str:
+        """Pick the first available voice: profile clone, cached clone, then default."""
+        return clone_id or cached_id or default
     
     async def create_instant_voice_clone(self, audio_data: bytes, speaker_id: str) -> str:
         """Create an instant voice clone from audio data."""
@@ -136,7 +206,7 @@ class ElevenLabsVoiceService:
             )
             
             # Cache the mapping
-            self.voice_cache[speaker_id] = voice.voice_id
+            self._cache_voice(speaker_id, voice.voice_id)
             
             logger.info(f"Created instant voice clone for speaker {speaker_id}: {voice.voice_id}")
             return voice.voice_id
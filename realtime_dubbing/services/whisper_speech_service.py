@@ -1,8 +1,7 @@
 import asyncio
 import io
-import tempfile
 import numpy as np
-import soundfile as sf
+import librosa
 from typing import Optional, AsyncGenerator, Dict, Any, List
 import whisper
 from pyannote.audio import Pipeline
@@ -13,6 +12,7 @@ import sys
 import os
 import concurrent.futures
 import functools
+import threading
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from models.audio_models import SpeechRecognitionResult, TranslationResult
@@ -23,11 +23,34 @@ logger = logging.getLogger(__name__)
 class WhisperSpeechService:
     """Local OpenAI Whisper Speech-to-Text service (completely free) with speaker diarization."""
     
+    # Peak amplitude below which a chunk is treated as digital silence
+    SILENCE_PEAK = 1e-6
+    
+    # transcribe()'s default quality gates, applied to batched decodes as well: a
+    # likely non-speech chunk with a low log-probability yields no text, and output
+    # that is too repetitive or unlikely is retried through transcribe()'s
+    # temperature fallback
+    NO_SPEECH_THRESHOLD = 0.6
+    LOGPROB_THRESHOLD = -1.0
+    COMPRESSION_RATIO_THRESHOLD = 2.4
+    
     def __init__(self):
         # Initialize local Whisper model
         self.model = None
         self.model_name = getattr(settings, 'whisper_model', 'base')  # Default to 'base' model
         self.diarization_pipeline = None
+        self.sample_rate = settings.sample_rate
+        self.fp16 = torch.cuda.is_available()  # Whisper only supports FP16 on GPU
+        
+        if torch.cuda.is_available():
+            # Let cuDNN pick the fastest convolution algorithms for our fixed chunk shapes
+            torch.backends.cudnn.benchmark = True
+        
+        # Whisper's decoder keeps its key/value cache in hooks on the shared model, so
+        # two decodes running at once corrupt each other's output; callers overlap
+        # everything else but take turns on the model
+        self._model_lock = threading.Lock()
+        
         self._init_whisper_model()
         self._init_diarization()
         
@@ -36,7 +59,6 @@ class WhisperSpeechService:
         
         # Buffer for streaming audio
         self.audio_buffer = []
-        self.sample_rate = settings.sample_rate
         
     def _init_whisper_model(self):
         """Initialize local Whisper model."""
@@ -56,6 +78,67 @@ class WhisperSpeechService:
             except Exception as fallback_e:
                 logger.error(f"Could not load fallback model: {fallback_e}")
                 raise Exception("Failed to initialize Whisper model")
+        
+        self._quantize_for_cpu()
+        eager_encoder = self._compile_encoder()
+        if not self._warmup_whisper() and eager_encoder is not None:
+            # Compilation errors only surface on the first call - fall back to eager mode
+            logger.warning("Compiled Whisper encoder failed, reverting to eager encoder")
+            self.model.encoder = eager_encoder
+            self._warmup_whisper()
+    
+    def _quantize_for_cpu(self):
+        """Quantize the model's Linear layers to int8 when running on CPU.
+        
+        The attention and MLP projections dominate Whisper's CPU time; dynamic int8
+        quantization stores their weights in a quarter of the memory and runs them
+        with int8 GEMMs. GPUs keep the float model and run it in FP16 instead.
+        """
+        if not settings.whisper_quantize_cpu or torch.cuda.is_available():
+            return
+        
+        try:
+            # Whisper's Linear subclass only adds a dtype cast for FP16 inference, which
+            # is a no-op on CPU; quantize_dynamic only swaps exact nn.Linear modules
+            for module in self.model.modules():
+                if isinstance(module, torch.nn.Linear):
+                    module.__class__ = torch.nn.Linear
+            self.model = torch.quantization.quantize_dynamic(
+                self.model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+            logger.info("Whisper Linear layers quantized to int8 for CPU inference")
+        except Exception as e:
+            logger.warning(f"Could not quantize Whisper model: {e}")
+    
+    def _compile_encoder(self):
+        """Compile the Whisper encoder for the fixed 30s mel input on GPU.
+        
+        Whisper pads every chunk to an 80x3000 mel spectrogram, so the encoder always
+        sees the same shape and "reduce-overhead" mode can replay it as a CUDA graph.
+        Returns the original encoder so callers can revert, or None if not compiled.
+        """
+        if not (settings.whisper_compile_encoder and torch.cuda.is_available() and hasattr(torch, "compile")):
+            return None
+        
+        eager_encoder = self.model.encoder
+        try:
+            self.model.encoder = torch.compile(eager_encoder, mode="reduce-overhead", fullgraph=True)
+            logger.info("Whisper encoder compiled with torch.compile")
+            return eager_encoder
+        except Exception as e:
+            logger.warning(f"Could not compile Whisper encoder: {e}")
+            self.model.encoder = eager_encoder
+            return None
+    
+    def _warmup_whisper(self) -> bool:
+        """Run one silent transcription so kernel setup doesn't stall the first real chunk."""
+        try:
+            self.model.transcribe(np.zeros(self.sample_rate, dtype=np.float32), fp16=self.fp16, language="en")
+            logger.info("Whisper model warmed up")
+            return True
+        except Exception as e:
+            logger.warning(f"Whisper warmup failed: {e}")
+            return False
     
     def _init_diarization(self):
         """Initialize speaker diarization pipeline."""
@@ -63,9 +146,14 @@ class WhisperSpeechService:
             # Initialize pyannote speaker diarization pipeline
             self.diarization_pipeline = Pipeline.from_pretrained(
                 settings.diarization_model,
-                use_auth_token=None  # You might need a Hugging Face token for some models
+                use_auth_token=settings.huggingface_token  # Gated models need a Hugging Face token
             )
             
+            if self.diarization_pipeline is None:
+                # from_pretrained returns None instead of raising when access is denied
+                logger.warning(f"Could not load {settings.diarization_model} - check HUGGINGFACE_TOKEN")
+                return
+            
             # Set device (GPU if available)
             if torch.cuda.is_available():
                 self.diarization_pipeline = self.diarization_pipeline.to(torch.device("cuda"))
@@ -74,107 +162,247 @@ class WhisperSpeechService:
         except Exception as e:
             logger.warning(f"Could not initialize speaker diarization: {e}")
             self.diarization_pipeline = None
+            return
+        
+        self._warmup_diarization()
+    
+    def _warmup_diarization(self):
+        """Run the diarization pipeline once on silence to load and tune its models."""
+        try:
+            self.diarization_pipeline({
+                "waveform": torch.zeros(1, 2 * self.sample_rate),
+                "sample_rate": self.sample_rate
+            })
+            logger.info("Speaker diarization pipeline warmed up")
+        except Exception as e:
+            logger.warning(f"Speaker diarization warmup failed: {e}")
     
     async def recognize_streaming(self, audio_generator: AsyncGenerator[bytes, None]) -> AsyncGenerator[SpeechRecognitionResult, None]:
-        """Perform streaming speech recognition with buffering."""
+        """Perform streaming speech recognition with buffering.
+        
+        Audio capture runs in a producer task that keeps filling the buffer and
+        schedules recognition for each full window, so inference on one window
+        overlaps with capturing the next. Windows still reach the model one at a
+        time (see _model_lock). Results are yielded in capture order.
+        """
         buffer_duration = 5.0  # Process every 5 seconds of audio
         buffer_samples = int(buffer_duration * self.sample_rate)
+        overlap_samples = int(1.0 * self.sample_rate)  # 1 second overlap
+        
+        # Recognition tasks in capture order; the bound applies backpressure to capture
+        pending_windows: asyncio.Queue = asyncio.Queue(maxsize=4)
+        
+        async def capture_audio():
+            try:
+                async for audio_chunk in audio_generator:
+                    # Convert bytes to numpy array
+                    audio_data = np.frombuffer(audio_chunk, dtype=np.int16).astype(np.float32) / 32768.0
+                    self.audio_buffer.extend(audio_data)
+                    
+                    # Schedule recognition whenever the buffer reaches target size
+                    while len(self.audio_buffer) >= buffer_samples:
+                        audio_for_processing = np.array(self.audio_buffer[:buffer_samples], dtype=np.float32)
+                        
+                        # Remove processed audio from buffer (keep some overlap)
+                        self.audio_buffer = self.audio_buffer[buffer_samples - overlap_samples:]
+                        
+                        await pending_windows.put(
+                            asyncio.ensure_future(self.recognize_audio_chunk(audio_for_processing))
+                        )
+            finally:
+                # Signal end of stream to the consumer
+                await pending_windows.put(None)
+        
+        producer = asyncio.create_task(capture_audio())
         
         try:
-            async for audio_chunk in audio_generator:
-                # Convert bytes to numpy array
-                audio_data = np.frombuffer(audio_chunk, dtype=np.int16).astype(np.float32) / 32768.0
-                self.audio_buffer.extend(audio_data)
+            while True:
+                recognition = await pending_windows.get()
+                if recognition is None:
+                    break
                 
-                # Process when buffer reaches target size
-                if len(self.audio_buffer) >= buffer_samples:
-                    # Get audio for processing
-                    audio_for_processing = np.array(self.audio_buffer[:buffer_samples])
-                    
-                    # Remove processed audio from buffer (keep some overlap)
-                    overlap_samples = int(1.0 * self.sample_rate)  # 1 second overlap
-                    self.audio_buffer = self.audio_buffer[buffer_samples - overlap_samples:]
-                    
-                    # Process this chunk
-                    try:
-                        result = await self.recognize_audio_chunk(audio_for_processing)
-                        if result.text.strip():  # Only yield non-empty results
-                            yield result
-                    except Exception as e:
-                        logger.error(f"Error processing audio chunk: {e}")
-                        continue
+                try:
+                    result = await recognition
+                    if result.text.strip():  # Only yield non-empty results
+                        yield result
+                except Exception as e:
+                    logger.error(f"Error processing audio chunk: {e}")
+                    continue
+            
+            # Propagate errors raised by the audio generator
+            await producer
                         
         except Exception as e:
             logger.error(f"Streaming recognition error: {e}")
             raise
+        finally:
+            producer.cancel()
+            while not pending_windows.empty():
+                recognition = pending_windows.get_nowait()
+                if recognition is not None:
+                    recognition.cancel()
     
     async def recognize_audio_chunk(self, audio_data: np.ndarray, language_code: str = "auto") -> SpeechRecognitionResult:
         """Recognize speech from a single audio chunk using local Whisper."""
         try:
-            # Create temporary audio file
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-                # Write audio data to temporary file
-                sf.write(temp_file.name, audio_data, self.sample_rate)
-                temp_file_path = temp_file.name
+            # Nothing to transcribe in silence - skip the Whisper forward pass
+            if self._is_silent(audio_data):
+                return self._empty_result(language_code)
+            
+            # Use local Whisper model for transcription (run in thread pool to avoid blocking)
+            whisper_options = {
+                "language": settings.whisper_language if hasattr(settings, 'whisper_language') and settings.whisper_language else None,
+                "task": "transcribe",
+                "fp16": self.fp16
+            }
+            
+            # Run Whisper in thread pool to avoid blocking the event loop
+            transcribe_func = functools.partial(
+                self._transcribe,
+                self._to_whisper_audio(audio_data),
+                **whisper_options
+            )
+            
+            loop = asyncio.get_event_loop()
+            whisper_result = await loop.run_in_executor(self.executor, transcribe_func)
+            
+            return await self._finish_result(
+                audio_data,
+                whisper_result["text"],
+                whisper_result.get("language", language_code),
+                whisper_result.get("segments", [])
+            )
             
-            try:
-                # Use local Whisper model for transcription (run in thread pool to avoid blocking)
-                whisper_options = {
-                    "language": settings.whisper_language if hasattr(settings, 'whisper_language') and settings.whisper_language else None,
-                    "task": "transcribe"
-                }
-                
-                # Run Whisper in thread pool to avoid blocking the event loop
-                transcribe_func = functools.partial(
-                    self.model.transcribe,
-                    temp_file_path,
-                    **whisper_options
-                )
-                
-                loop = asyncio.get_event_loop()
-                whisper_result = await loop.run_in_executor(self.executor, transcribe_func)
-                
-                # Extract text and other information
-                text = whisper_result["text"].strip()
-                language = whisper_result.get("language", language_code)
-                
-                # Calculate confidence from segments if available
-                confidence = self._calculate_confidence_from_segments(whisper_result.get("segments", []))
-                if confidence == 0.0:  # Fallback to text-based estimation
-                    confidence = self._estimate_confidence(text)
-                
-                # Perform speaker diarization if available
-                speaker_id = None
-                if self.diarization_pipeline and len(audio_data) > self.sample_rate * 2:  # At least 2 seconds
-                    try:
-                        speaker_id = await self._perform_diarization(temp_file_path, audio_data)
-                    except Exception as e:
-                        logger.warning(f"Speaker diarization failed: {e}")
-                
-                return SpeechRecognitionResult(
-                    text=text,
-                    confidence=confidence,
-                    language=language,
-                    speaker_id=speaker_id,
-                    is_final=True
-                )
-                
-            finally:
-                # Clean up temporary file
-                try:
-                    os.unlink(temp_file_path)
-                except Exception:
-                    pass
-                    
         except Exception as e:
             logger.error(f"Audio chunk recognition error: {e}")
             # Return empty result instead of raising
-            return SpeechRecognitionResult(
-                text="",
-                confidence=0.0,
-                language=language_code,
-                is_final=True
+            return self._empty_result(language_code)
+    
+    async def recognize_batch(self, audio_chunks: List[np.ndarray], language_code: str = "auto") -> List[SpeechRecognitionResult]:
+        """Recognize several audio chunks with one batched Whisper decode.
+        
+        Whisper pads every input to a 30s log-mel window, so chunks up to 30s are
+        stacked along the batch axis and share one encoder/decoder pass. Silent
+        chunks short-circuit; longer chunks, and decodes that fail transcribe()'s
+        quality checks, go through recognize_audio_chunk. Results are returned in
+        input order.
+        """
+        results: List[Optional[SpeechRecognitionResult]] = [None] * len(audio_chunks)
+        batched: List[int] = []
+        singles: List[int] = []
+        for i, audio_data in enumerate(audio_chunks):
+            if self._is_silent(audio_data):
+                results[i] = self._empty_result(language_code)
+            elif len(audio_data) <= settings.sample_rate * whisper.audio.CHUNK_LENGTH:
+                batched.append(i)
+            else:
+                singles.append(i)
+        
+        if batched:
+            try:
+                loop = asyncio.get_event_loop()
+                decoded = await loop.run_in_executor(
+                    self.executor, self._decode_batch, [audio_chunks[i] for i in batched]
+                )
+                retried: List[int] = []
+                for i, decoding in zip(batched, decoded):
+                    if decoding.no_speech_prob > self.NO_SPEECH_THRESHOLD:
+                        if decoding.avg_logprob < self.LOGPROB_THRESHOLD:
+                            results[i] = self._empty_result(language_code)
+                            continue
+                    elif (decoding.compression_ratio > self.COMPRESSION_RATIO_THRESHOLD
+                          or decoding.avg_logprob < self.LOGPROB_THRESHOLD):
+                        retried.append(i)
+                        continue
+                    results[i] = await self._finish_result(
+                        audio_chunks[i],
+                        decoding.text,
+                        decoding.language or language_code,
+                        [{"avg_logprob": decoding.avg_logprob, "text": decoding.text}]
+                    )
+                singles.extend(retried)
+            except Exception as e:
+                logger.error(f"Batched recognition error, falling back to single chunks: {e}")
+                singles.extend(batched)
+        
+        single_results = await asyncio.gather(
+            *(self.recognize_audio_chunk(audio_chunks[i], language_code) for i in singles)
+        )
+        for i, result in zip(singles, single_results):
+            results[i] = result
+        
+        return results
+    
+    def _decode_batch(self, audio_chunks: List[np.ndarray]) -> List[Any]:
+        """Run one batched Whisper decode over chunks of at most 30s."""
+        mels = torch.stack([
+            whisper.log_mel_spectrogram(
+                whisper.pad_or_trim(self._to_whisper_audio(audio_data)), self.model.dims.n_mels
             )
+            for audio_data in audio_chunks
+        ]).to(self.model.device)
+        
+        options = whisper.DecodingOptions(
+            language=settings.whisper_language or None,
+            task="transcribe",
+            fp16=self.fp16
+        )
+        with self._model_lock:
+            return whisper.decode(self.model, mels, options)
+    
+    def _transcribe(self, audio: np.ndarray, **options) -> Dict[str, Any]:
+        """Run model.transcribe while holding the model lock."""
+        with self._model_lock:
+            return self.model.transcribe(audio, **options)
+    
+    def _is_silent(self, audio_data: np.ndarray) -> bool:
+        """True for empty chunks and chunks whose peak is below SILENCE_PEAK."""
+        return audio_data.size == 0 or np.abs(audio_data).max() < self.SILENCE_PEAK
+    
+    def _to_whisper_audio(self, audio_data: np.ndarray) -> np.ndarray:
+        """Float32 waveform at Whisper's 16 kHz, passed in memory rather than via a WAV file."""
+        whisper_audio = np.asarray(audio_data, dtype=np.float32)
+        if self.sample_rate != whisper.audio.SAMPLE_RATE:
+            whisper_audio = librosa.resample(
+                whisper_audio, orig_sr=self.sample_rate, target_sr=whisper.audio.SAMPLE_RATE
+            )
+        return whisper_audio
+    
+    def _empty_result(self, language_code: str) -> SpeechRecognitionResult:
+        """Result for a chunk with no recognizable speech."""
+        return SpeechRecognitionResult(
+            text="",
+            confidence=0.0,
+            language=language_code,
+            is_final=True
+        )
+    
+    async def _finish_result(self, audio_data: np.ndarray, text: str, language: str,
+                             segments: List[Dict]) -> SpeechRecognitionResult:
+        """Build the recognition result for a chunk, with confidence and speaker."""
+        # Extract text and other information
+        text = text.strip()
+        
+        # Calculate confidence from segments if available
+        confidence = self._calculate_confidence_from_segments(segments)
+        if confidence == 0.0:  # Fallback to text-based estimation
+            confidence = self._estimate_confidence(text)
+        
+        # Perform speaker diarization if available
+        speaker_id = None
+        if self.diarization_pipeline and len(audio_data) > self.sample_rate * 2:  # At least 2 seconds
+            try:
+                speaker_id = await self._perform_diarization(audio_data)
+            except Exception as e:
+                logger.warning(f"Speaker diarization failed: {e}")
+        
+        return SpeechRecognitionResult(
+            text=text,
+            confidence=confidence,
+            language=language,
+            speaker_id=speaker_id,
+            is_final=True
+        )
     
     def _calculate_confidence_from_segments(self, segments: List[Dict]) -> float:
         """Calculate confidence score from Whisper segments."""
@@ -234,14 +462,19 @@ class WhisperSpeechService:
             
         return max(0.1, min(0.95, confidence))
     
-    async def _perform_diarization(self, audio_file_path: str, audio_data: np.ndarray) -> Optional[str]:
+    async def _perform_diarization(self, audio_data: np.ndarray) -> Optional[str]:
         """Perform speaker diarization on audio."""
         if not self.diarization_pipeline:
             return None
             
         try:
-            # Run diarization
-            diarization = self.diarization_pipeline(audio_file_path)
+            # Run diarization on the in-memory waveform (channel, time); capping the
+            # number of speakers keeps the clustering step cheap
+            waveform = torch.from_numpy(np.asarray(audio_data, dtype=np.float32)).unsqueeze(0)
+            diarization = self.diarization_pipeline(
+                {"waveform": waveform, "sample_rate": self.sample_rate},
+                max_speakers=settings.max_speakers
+            )
             
             # Find the most prominent speaker in this segment
             speaker_durations = {}
@@ -1,20 +1,39 @@
 import numpy as np
 import librosa
-from typing import Dict, List, Optional, Tuple, Set
+from typing import Dict, List, Optional, Tuple
 import logging
 import os
 import sys
 import json
 import time
 import pickle
+import hashlib
+import multiprocessing
+import threading
+from collections import OrderedDict
+from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from itertools import repeat
 from pathlib import Path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+try:
+    import faiss
+except ImportError:  # optional: very large registries fall back to the int8 scan
+    faiss = None
+
 from models.audio_models import SpeakerProfile, AudioChunk
 from config.settings import settings
+from utils.audio_kernels import delta_features, masked_mean_std_ptp
 
 logger = logging.getLogger(__name__)
 
+# pYIN search range (C2-C7, ~65-2093 Hz) covers speaking and singing voices
+PITCH_FMIN = librosa.note_to_hz('C2')
+PITCH_FMAX = librosa.note_to_hz('C7')
+_pyin = partial(librosa.pyin, fmin=PITCH_FMIN, fmax=PITCH_FMAX)
+
 class WSISpeakerIdentification:
     """Advanced speaker identification using WSI (Whisper Speaker Identification) framework.
     
@@ -23,209 +42,698 @@ class WSISpeakerIdentification:
     techniques and a persistent speaker profile database.
     """
     
+    # Above this many speakers the full scan runs on int8-quantized embeddings
+    # and only the best candidates are re-scored in float32
+    QUANTIZED_SCAN_MIN_SPEAKERS = 1024
+    RERANK_CANDIDATES = 8
+    
+    # Above this many speakers (and with faiss installed) candidates come from an
+    # IVF index over ~sqrt(N) clusters instead of a full scan
+    ANN_INDEX_MIN_SPEAKERS = 10000
+    ANN_NPROBE = 16
+    
+    # Pitch (Hz) -> gender likelihood breakpoints for _estimate_gender_likelihood
+    GENDER_PITCH_HZ = np.array([85.0, 165.0, 255.0])
+    GENDER_LIKELIHOOD = np.array([0.0, 0.5, 1.0])
+    
+    # Embeddings memoized by waveform content; bump FEATURE_VERSION whenever
+    # the feature pipeline changes so stale vectors are never served
+    EMBEDDING_CACHE_SIZE = 2048
+    FEATURE_VERSION = 1
+    
+    # Chunks per librosa pass in identify_speakers_batch
+    EXTRACTION_BATCH_SIZE = 16
+    
+    # A matched speaker's profile is written to disk every this many updates
+    PROFILE_SAVE_INTERVAL = 5
+    
     def __init__(self, profile_dir: str = "data/speaker_profiles"):
         # Speaker profile storage
         self.profile_dir = Path(profile_dir)
         self.profile_dir.mkdir(exist_ok=True, parents=True)
         
+        # Configuration
+        self.similarity_threshold = settings.voice_similarity_threshold
+        self.embedding_dimension = 256  # WSI uses 256-dimensional embeddings
+        
         # Active speaker tracking
         self.speaker_profiles: Dict[str, SpeakerProfile] = {}
-        self.speaker_embeddings: List[np.ndarray] = []
-        self.speaker_ids: List[str] = []
+        self.speaker_ids: List[str] = []  # row index -> speaker_id
+        self.id_to_index: Dict[str, int] = {}  # speaker_id -> row index
+        
+        # Contiguous embedding rows (grown by doubling) so matching is a single GEMV,
+        # mirrored as int8 rows with per-row scales for the quantized scan
+        self._embedding_buffer = np.empty((16, self.embedding_dimension), dtype=np.float32)
+        self._quantized_buffer = np.empty((16, self.embedding_dimension), dtype=np.int8)
+        self._quantized_scales = np.empty(16, dtype=np.float32)
         
         # Session-specific tracking
-        self.session_speakers: Dict[str, Set[str]] = {}  # session_id -> set of speaker_ids
+        self.session_indices: Dict[str, np.ndarray] = {}  # session_id -> matrix rows of its speakers
         
-        # Configuration
-        self.similarity_threshold = settings.voice_similarity_threshold
-        self.embedding_dimension = 256  # WSI uses 256-dimensional embeddings
+        # Inverted-file index over the embedding rows (faiss id == row index), built on
+        # first use past ANN_INDEX_MIN_SPEAKERS and rebuilt as the registry grows or drifts
+        self._ann_index = None
+        self._ann_built_rows = 0
+        self._ann_stale_rows = 0
+        
+        # Profile writes run on one background thread so matching never waits on disk.
+        # Saves queued while a write is pending are coalesced into it. _stored_rows and
+        # _stored_metadata mirror what is on disk and are owned by the writer thread.
+        self._profile_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="wsi-profile-writer")
+        self._stored_rows = 0
+        self._stored_metadata: List[Dict] = []
+        self._updates_since_save: Dict[str, int] = {}
+        self._pending_lock = threading.Lock()
+        self._pending_rows: Dict[int, np.ndarray] = {}  # row index -> embedding snapshot
+        self._pending_metadata: Dict[int, Dict] = {}  # row index -> profiles.json entry
+        self._write_scheduled = False
+        
+        # Worker processes for batch embedding extraction, started on first use. They
+        # come from a forkserver: forking this process directly would copy locks held
+        # by its other threads (torch, logging, the profile writer) into the children
+        self._extraction_pool: Optional[ProcessPoolExecutor] = None
+        
+        # pYIN output (f0, voiced_flag, voiced_probs) of the last extracted waveform,
+        # reused when that chunk enrolls a new speaker
+        self._last_pitch: Optional[Tuple[np.ndarray, Tuple[np.ndarray, np.ndarray, np.ndarray]]] = None
+        
+        # LRU of content hash -> embedding, so retried or overlapping chunks skip extraction.
+        # Extraction may run off the event loop, so the LRU and the pool creation are locked.
+        self._embedding_cache: OrderedDict = OrderedDict()
+        self._extraction_lock = threading.Lock()
+        self._embedding_cache_salt = (
+            f"{self.FEATURE_VERSION}:{self.embedding_dimension}".encode()
+        )
         
         # Load existing profiles
         self._load_speaker_profiles()
     
+    @property
+    def embedding_matrix(self) -> np.ndarray:
+        """Embeddings of all enrolled speakers, one row per speaker."""
+        return self._embedding_buffer[:len(self.speaker_ids)]
+    
+    def _append_embedding(self, speaker_id: str, embedding: np.ndarray):
+        """Add a speaker's embedding as a new row, growing the buffers if needed."""
+        index = len(self.speaker_ids)
+        if index == len(self._embedding_buffer):
+            capacity = 2 * len(self._embedding_buffer)
+            self._embedding_buffer = self._grow(self._embedding_buffer, capacity, index)
+            self._quantized_buffer = self._grow(self._quantized_buffer, capacity, index)
+            self._quantized_scales = self._grow(self._quantized_scales, capacity, index)
+        
+            # Profiles view their matrix row, so re-point them at the new buffer
+            for sid, row in self.id_to_index.items():
+                self.speaker_profiles[sid].voice_embedding = self._embedding_buffer[row]
+        
+        self._set_embedding_row(index, embedding)
+        self.speaker_ids.append(speaker_id)
+        self.id_to_index[speaker_id] = index
+        if self._ann_index is not None:
+            self._ann_index.add(self._embedding_buffer[index:index + 1])
+        if speaker_id in self.speaker_profiles:
+            self.speaker_profiles[speaker_id].voice_embedding = self._embedding_buffer[index]
+    
+    @staticmethod
+    def _grow(buffer: np.ndarray, capacity: int, used: int) -> np.ndarray:
+        """Return a copy of the first `used` rows of a buffer with room for `capacity` rows."""
+        grown = np.empty((capacity,) + buffer.shape[1:], dtype=buffer.dtype)
+        grown[:used] = buffer[:used]
+        return grown
+    
+    def _set_embedding_row(self, index: int, embedding: np.ndarray):
+        """Store an embedding in the float32 matrix and its int8 mirror."""
+        self._embedding_buffer[index] = embedding
+        self._quantized_buffer[index], self._quantized_scales[index] = self._quantize(embedding)
+    
+    @staticmethod
+    def _quantize(embedding: np.ndarray) -> Tuple[np.ndarray, float]:
+        """Symmetric int8 quantization with a per-vector scale (embedding ~= q * scale)."""
+        peak = float(np.max(np.abs(embedding)))
+        scale = peak / 127.0 if peak > 0 else 1.0
+        return np.round(embedding / scale).astype(np.int8), scale
+    
+    def _scan_candidates(self, embedding: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Find the speakers most similar to an embedding.
+        
+        Returns (row indices, float32 similarities). Small registries are scored
+        exactly; large ones are scanned in int8 and the top candidates re-scored.
+        """
+        num_speakers = len(self.speaker_ids)
+        if num_speakers < self.QUANTIZED_SCAN_MIN_SPEAKERS:
+            return np.arange(num_speakers), self.embedding_matrix @ embedding
+        
+        if faiss is not None and num_speakers >= self.ANN_INDEX_MIN_SPEAKERS:
+            candidates = self._ann_candidates(embedding)
+            if candidates.size > 0:
+                return candidates, self._embedding_buffer[candidates] @ embedding
+        
+        # Approximate scan: int8 dot products accumulated in int32, then rescaled
+        query, query_scale = self._quantize(embedding)
+        approx = np.einsum(
+            'ij,j->i', self._quantized_buffer[:num_speakers], query, dtype=np.int32
+        ) * (self._quantized_scales[:num_speakers] * query_scale)
+        
+        # Exact rerank of the best candidates
+        candidates = np.argpartition(approx, -self.RERANK_CANDIDATES)[-self.RERANK_CANDIDATES:]
+        return candidates, self._embedding_buffer[candidates] @ embedding
+    
+    def _ann_candidates(self, embedding: np.ndarray) -> np.ndarray:
+        """Row indices of the approximate nearest speakers from the faiss IVF index."""
+        num_speakers = len(self.speaker_ids)
+        if (self._ann_index is None or num_speakers >= 2 * self._ann_built_rows
+                or self._ann_stale_rows > num_speakers // 4):
+            self._build_ann_index()
+        
+        _, ids = self._ann_index.search(embedding[np.newaxis], self.RERANK_CANDIDATES)
+        return ids[0][ids[0] >= 0]
+    
+    def _build_ann_index(self):
+        """(Re)train the IVF index on the current embedding rows."""
+        matrix = self.embedding_matrix
+        nlist = int(np.sqrt(len(matrix)))
+        quantizer = faiss.IndexFlatIP(self.embedding_dimension)
+        index = faiss.IndexIVFFlat(quantizer, self.embedding_dimension, nlist, faiss.METRIC_INNER_PRODUCT)
+        index.train(matrix)
+        index.add(matrix)
+        index.nprobe = self.ANN_NPROBE
+        
+        self._ann_quantizer = quantizer  # the index does not own its quantizer
+        self._ann_index = index
+        self._ann_built_rows = len(matrix)
+        self._ann_stale_rows = 0
+        logger.info(f"Built speaker ANN index over {len(matrix)} speakers ({nlist} lists)")
+    
     def _load_speaker_profiles(self):
-        """Load existing speaker profiles from disk."""
+        """Load existing speaker profiles from disk.
+        
+        Embeddings live in one N x 256 float32 `embeddings.npy` that is memory-mapped
+        and copied into the embedding matrix in bulk; `profiles.json` holds the
+        per-speaker metadata in the same row order.
+        """
         try:
-            profile_files = list(self.profile_dir.glob("*.profile"))
-            logger.info(f"Found {len(profile_files)} speaker profiles")
+            metadata_path = self.profile_dir / "profiles.json"
+            embeddings_path = self.profile_dir / "embeddings.npy"
+            if not metadata_path.exists() or not embeddings_path.exists():
+                self._migrate_pickled_profiles()
+                return
+            
+            with open(metadata_path, 'r') as f:
+                metadata = json.load(f)
+            embeddings = np.load(embeddings_path, mmap_mode='r')
+            
+            # A crash between the two writes can leave one file a row ahead
+            count = min(len(metadata), len(embeddings))
+            capacity = max(16, 1 << (count - 1).bit_length())
+            self._embedding_buffer = np.empty((capacity, self.embedding_dimension), dtype=np.float32)
+            self._quantized_buffer = np.empty((capacity, self.embedding_dimension), dtype=np.int8)
+            self._quantized_scales = np.empty(capacity, dtype=np.float32)
+            self._embedding_buffer[:count] = embeddings[:count]
+            del embeddings
+            
+            for index, entry in enumerate(metadata[:count]):
+                speaker_id = entry["speaker_id"]
+                embedding = self._embedding_buffer[index]
+                self._quantized_buffer[index], self._quantized_scales[index] = self._quantize(embedding)
+                self.speaker_ids.append(speaker_id)
+                self.id_to_index[speaker_id] = index
+                self.speaker_profiles[speaker_id] = SpeakerProfile(
+                    speaker_id=speaker_id,
+                    voice_embedding=embedding,
+                    voice_clone_id=entry.get("voice_clone_id"),
+                    confidence=entry.get("confidence", 0.0),
+                    characteristics=entry.get("characteristics") or {}
+                )
+            self._stored_rows = count
+            self._stored_metadata = metadata[:count]
             
-            for profile_path in profile_files:
-                try:
-                    with open(profile_path, 'rb') as f:
-                        profile = pickle.load(f)
-                        
-                    # Add to active tracking
-                    self.speaker_profiles[profile.speaker_id] = profile
-                    self.speaker_embeddings.append(profile.voice_embedding)
-                    self.speaker_ids.append(profile.speaker_id)
-                    
-                    logger.debug(f"Loaded speaker profile: {profile.speaker_id}")
-                except Exception as e:
-                    logger.error(f"Error loading profile {profile_path}: {e}")
+            logger.info(f"Loaded {count} speaker profiles")
         except Exception as e:
             logger.error(f"Error loading speaker profiles: {e}")
     
+    def _migrate_pickled_profiles(self):
+        """Convert per-speaker `*.profile` pickles from older versions to the archive format."""
+        profile_files = sorted(self.profile_dir.glob("*.profile"))
+        if not profile_files:
+            return
+        
+        logger.info(f"Migrating {len(profile_files)} pickled speaker profiles")
+        for profile_path in profile_files:
+            try:
+                with open(profile_path, 'rb') as f:
+                    profile = pickle.load(f)
+                self.speaker_profiles[profile.speaker_id] = profile
+                self._append_embedding(profile.speaker_id, profile.voice_embedding)
+            except Exception as e:
+                logger.error(f"Error loading profile {profile_path}: {e}")
+        
+        self._stored_metadata = [
+            self._profile_entry(self.speaker_profiles[speaker_id]) for speaker_id in self.speaker_ids
+        ]
+        self._write_embeddings(self.embedding_matrix)
+        self._write_profile_metadata(self._stored_metadata)
+        self._stored_rows = len(self.speaker_ids)
+    
     def _save_speaker_profile(self, profile: SpeakerProfile):
-        """Save speaker profile to disk."""
+        """Queue a save of the speaker profile on the background writer.
+        
+        Only this speaker's row and metadata are snapshotted here, so later updates
+        can't race the write and the cost doesn't grow with the registry. Saves that
+        arrive before the writer gets to them are written together.
+        """
         try:
-            profile_path = self.profile_dir / f"{profile.speaker_id}.profile"
-            with open(profile_path, 'wb') as f:
-                pickle.dump(profile, f)
-            logger.debug(f"Saved speaker profile: {profile.speaker_id}")
+            index = self.id_to_index[profile.speaker_id]
+            row = self._embedding_buffer[index].copy()
+            entry = self._profile_entry(profile)
+            
+            self._updates_since_save[profile.speaker_id] = 0
+            with self._pending_lock:
+                self._pending_rows[index] = row
+                self._pending_metadata[index] = entry
+                if not self._write_scheduled:
+                    self._write_scheduled = True
+                    self._profile_writer.submit(self._write_pending_profiles)
         except Exception as e:
             logger.error(f"Error saving speaker profile {profile.speaker_id}: {e}")
     
+    def _write_pending_profiles(self):
+        """Write the queued profile snapshots to disk (runs on the writer thread).
+        
+        Rows of stored speakers are rewritten in place through the memory map; rows of
+        new speakers are appended to the archive. The JSON sidecar is replaced atomically.
+        If the write fails, the snapshots go back in the queue for the next save or flush.
+        """
+        with self._pending_lock:
+            rows, self._pending_rows = self._pending_rows, {}
+            entries, self._pending_metadata = self._pending_metadata, {}
+            self._write_scheduled = False
+        if not rows:
+            return
+        
+        try:
+            appended = sorted(index for index in rows if index >= self._stored_rows)
+            if appended and not (
+                appended == list(range(self._stored_rows, self._stored_rows + len(appended)))
+                and len(self._stored_metadata) == self._stored_rows
+            ):
+                # The new rows don't continue the stored ones: rewrite both files
+                self._rewrite_all_profiles()
+                logger.debug(f"Rewrote {self._stored_rows} speaker profiles")
+                return
+            
+            updated = {index: row for index, row in rows.items() if index < self._stored_rows}
+            if updated:
+                stored = np.load(self.profile_dir / "embeddings.npy", mmap_mode='r+')
+                for index, row in updated.items():
+                    stored[index] = row
+                stored.flush()
+                del stored
+            
+            if appended:
+                self._append_embedding_rows(np.stack([rows[index] for index in appended]))
+            
+            # Patch the entries into the stored list; appended rows continue it in order
+            for index in sorted(entries):
+                if index < len(self._stored_metadata):
+                    self._stored_metadata[index] = entries[index]
+                else:
+                    self._stored_metadata.append(entries[index])
+            self._write_profile_metadata(self._stored_metadata)
+            logger.debug(f"Saved {len(rows)} speaker profiles")
+        except Exception as e:
+            logger.error(f"Error saving speaker profiles, will retry: {e}")
+            # Newer snapshots queued meanwhile win over the ones being put back
+            with self._pending_lock:
+                rows.update(self._pending_rows)
+                entries.update(self._pending_metadata)
+                self._pending_rows, self._pending_metadata = rows, entries
+    
+    def _rewrite_all_profiles(self):
+        """Replace both profile files with every enrolled speaker's current state."""
+        count = len(self.speaker_ids)
+        matrix = self._embedding_buffer[:count].copy()
+        metadata = [self._profile_entry(self.speaker_profiles[speaker_id])
+                    for speaker_id in self.speaker_ids[:count]]
+        self._write_embeddings(matrix)
+        self._write_profile_metadata(metadata)
+        self._stored_rows = count
+        self._stored_metadata = metadata
+    
+    def _append_embedding_rows(self, rows: np.ndarray):
+        """Append rows after the stored ones in `embeddings.npy`, then update its header.
+        
+        The header is rewritten in place only after the rows are on disk; numpy pads it
+        so the first dimension can grow without changing its length. A crash in between
+        leaves the old shape, and the next append overwrites the orphaned bytes.
+        """
+        embeddings_path = self.profile_dir / "embeddings.npy"
+        if self._stored_rows == 0 or not embeddings_path.exists():
+            self._write_embeddings(rows)
+            self._stored_rows = len(rows)
+            return
+        
+        count = self._stored_rows + len(rows)
+        with open(embeddings_path, 'r+b') as f:
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                read_header, write_header = np.lib.format.read_array_header_1_0, np.lib.format.write_array_header_1_0
+            else:
+                read_header, write_header = np.lib.format.read_array_header_2_0, np.lib.format.write_array_header_2_0
+            shape, fortran_order, dtype = read_header(f)
+            header_length = f.tell()
+            
+            header = BytesIO()
+            write_header(header, {
+                'descr': np.lib.format.dtype_to_descr(dtype),
+                'fortran_order': fortran_order,
+                'shape': (count,) + shape[1:]
+            })
+            
+            if len(header.getvalue()) == header_length:
+                f.seek(header_length + self._stored_rows * rows.shape[1] * dtype.itemsize)
+                f.write(np.ascontiguousarray(rows, dtype=dtype).tobytes())
+                f.truncate()
+                f.flush()
+                os.fsync(f.fileno())
+                f.seek(0)
+                f.write(header.getvalue())
+                header = None
+        
+        if header is not None:
+            # The header can't grow in place (older numpy): rewrite the whole archive
+            stored = np.load(embeddings_path, mmap_mode='r')
+            matrix = np.concatenate([stored[:self._stored_rows], rows])
+            del stored
+            self._write_embeddings(matrix)
+        self._stored_rows = count
+    
+    def flush_profiles(self):
+        """Block until all queued profile writes have reached disk (retrying failed ones)."""
+        self._profile_writer.submit(self._write_pending_profiles).result()
+    
+    def shutdown(self):
+        """Finish pending profile writes and stop the writer thread and extraction workers."""
+        self._profile_writer.shutdown(wait=True)
+        with self._extraction_lock:
+            pool, self._extraction_pool = self._extraction_pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+    
+    @staticmethod
+    def _profile_entry(profile: SpeakerProfile) -> Dict:
+        """Serializable metadata of one speaker, as stored in `profiles.json`."""
+        # Characteristics are all numeric (see _analyze_advanced_voice_characteristics);
+        # coerce numpy scalars to float for JSON serialization in one pass
+        characteristics = profile.characteristics or {}
+        return {
+            "speaker_id": profile.speaker_id,
+            "voice_clone_id": profile.voice_clone_id,
+            "confidence": float(profile.confidence),
+            "characteristics": dict(zip(characteristics, map(float, characteristics.values())))
+        }
+    
+    def _write_embeddings(self, matrix: np.ndarray):
+        """Atomically replace `embeddings.npy` with the given embedding matrix."""
+        embeddings_path = self.profile_dir / "embeddings.npy"
+        tmp_path = self.profile_dir / "embeddings.npy.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, matrix)
+        os.replace(tmp_path, embeddings_path)
+    
+    def _write_profile_metadata(self, metadata: List[Dict]):
+        """Atomically replace `profiles.json` with the given metadata list."""
+        metadata_path = self.profile_dir / "profiles.json"
+        tmp_path = self.profile_dir / "profiles.json.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(metadata, f, indent=2)
+        os.replace(tmp_path, metadata_path)
+    
     def extract_speaker_embedding(self, audio_chunk: AudioChunk) -> np.ndarray:
         """Extract advanced speaker embedding from audio chunk.
         
-        This implementation uses a more sophisticated approach than the base version,
-        extracting a 256-dimensional embedding that captures speaker identity more effectively.
+        Embeddings are memoized by a hash of the waveform, so a chunk that is
+        presented again (retries, VAD overlaps) skips the librosa pipeline.
+        The returned array is shared with the cache and is read-only.
+        """
+        key = self._embedding_cache_key(audio_chunk)
+        embedding = self._cached_embedding(key)
+        if embedding is not None:
+            return embedding
+        
+        embedding, pitch = self._compute_speaker_embedding(audio_chunk, self.embedding_dimension)
+        self._last_pitch = (audio_chunk.data, pitch) if pitch is not None else None
+        self._cache_embedding(key, embedding)
+        return embedding
+    
+    def _cached_embedding(self, key: bytes) -> Optional[np.ndarray]:
+        """Look up an embedding in the LRU, marking it as recently used."""
+        with self._extraction_lock:
+            embedding = self._embedding_cache.get(key)
+            if embedding is not None:
+                self._embedding_cache.move_to_end(key)
+            return embedding
+    
+    def _cache_embedding(self, key: bytes, embedding: np.ndarray):
+        """Insert an embedding into the LRU, evicting the least recently used entry."""
+        if not np.any(embedding):  # never cache the zero fallback from a failed extraction
+            return
+        embedding.flags.writeable = False
+        with self._extraction_lock:
+            self._embedding_cache[key] = embedding
+            if len(self._embedding_cache) > self.EMBEDDING_CACHE_SIZE:
+                self._embedding_cache.popitem(last=False)
+    
+    def _embedding_cache_key(self, audio_chunk: AudioChunk) -> bytes:
+        """Hash the waveform together with everything else the embedding depends on."""
+        data = np.ascontiguousarray(audio_chunk.data)
+        hasher = hashlib.blake2b(self._embedding_cache_salt, digest_size=16)
+        hasher.update(f":{audio_chunk.sample_rate}:{data.dtype.str}:{data.shape}".encode())
+        hasher.update(data.data)
+        return hasher.digest()
+    
+    @staticmethod
+    def _compute_speaker_embedding(audio_chunk: AudioChunk, embedding_dimension: int) -> Tuple[np.ndarray, Optional[tuple]]:
+        """Run the feature pipeline for one audio chunk.
+        
+        Returns the embedding and the pYIN output, or None for the pitch on failure.
+        Depends only on its arguments, so it can run in a worker process.
         """
         try:
-            # Extract MFCC features with more coefficients
-            mfccs = librosa.feature.mfcc(
-                y=audio_chunk.data, 
-                sr=audio_chunk.sample_rate, 
-                n_mfcc=40  # More coefficients for better speaker differentiation
-            )
-            
-            # Delta and delta-delta features (velocity and acceleration)
-            mfcc_delta = librosa.feature.delta(mfccs)
-            mfcc_delta2 = librosa.feature.delta(mfccs, order=2)
-            
-            # Spectral features
-            spectral_contrast = librosa.feature.spectral_contrast(
-                y=audio_chunk.data, sr=audio_chunk.sample_rate
+            # librosa keeps the input dtype, so float32 input avoids float64 FFTs and copies
+            data = np.ascontiguousarray(audio_chunk.data, dtype=np.float32)
+            embeddings, f0, voiced_flag, voiced_probs = WSISpeakerIdentification._compute_speaker_embeddings(
+                data[np.newaxis], audio_chunk.sample_rate, embedding_dimension
             )
-            
-            spectral_flatness = librosa.feature.spectral_flatness(
-                y=audio_chunk.data
-            )
-            
-            # Pitch features with better tracking
-            f0, voiced_flag, voiced_probs = librosa.pyin(
-                audio_chunk.data, 
-                fmin=librosa.note_to_hz('C2'), 
-                fmax=librosa.note_to_hz('C7'),
-                sr=audio_chunk.sample_rate
-            )
-            
-            pitch_features = np.array([
-                np.mean(f0[~np.isnan(f0)]) if np.any(~np.isnan(f0)) else 0,
-                np.std(f0[~np.isnan(f0)]) if np.any(~np.isnan(f0)) else 0,
-                np.mean(voiced_probs) if len(voiced_probs) > 0 else 0
-            ])
-            
-            # Flatten all features
-            mfcc_features = np.hstack([
-                np.mean(mfccs, axis=1),
-                np.std(mfccs, axis=1),
-                np.mean(mfcc_delta, axis=1),
-                np.mean(mfcc_delta2, axis=1)
-            ])
-            
-            spectral_features = np.hstack([
-                np.mean(spectral_contrast, axis=1),
-                np.mean(spectral_flatness),
-                np.std(spectral_flatness)
-            ])
-            
-            # Combine all features
-            raw_embedding = np.hstack([mfcc_features, spectral_features, pitch_features])
-            
-            # Pad or truncate to ensure consistent dimension
-            if len(raw_embedding) > self.embedding_dimension:
-                embedding = raw_embedding[:self.embedding_dimension]
-            else:
-                embedding = np.pad(
-                    raw_embedding, 
-                    (0, self.embedding_dimension - len(raw_embedding)),
-                    'constant'
-                )
-            
-            # Normalize
-            embedding = embedding / (np.linalg.norm(embedding) + 1e-8)
-            
-            return embedding
+            return embeddings[0], (f0[0], voiced_flag[0], voiced_probs[0])
             
         except Exception as e:
             logger.error(f"Error extracting WSI speaker embedding: {e}")
             # Return zero embedding as fallback
-            return np.zeros(self.embedding_dimension)
+            return np.zeros(embedding_dimension, dtype=np.float32), None
+    
+    @staticmethod
+    def _compute_speaker_embeddings(data: np.ndarray, sample_rate: int,
+                                    embedding_dimension: int) -> Tuple[np.ndarray, ...]:
+        """Extract embeddings for a batch of equal-length waveforms of shape (batch, samples).
+        
+        This implementation uses a more sophisticated approach than the base version,
+        extracting a 256-dimensional embedding that captures speaker identity more effectively.
+        Every librosa stage runs once over the whole batch; all per-frame statistics are
+        taken per waveform, so each row equals the embedding of that waveform alone.
+        Returns (embeddings, f0, voiced_flag, voiced_probs), each with a leading batch axis.
+        """
+        # Compute the magnitude spectrogram once and share it across all spectral features
+        S = np.abs(librosa.stft(data))
+        S_power = S**2
+        
+        # Extract MFCC features with more coefficients. The 80 dB floor is applied
+        # per waveform, as power_to_db would do for a single one
+        mel_db = librosa.power_to_db(
+            librosa.feature.melspectrogram(S=S_power, sr=sample_rate), top_db=None
+        )
+        mel_db = np.maximum(mel_db, mel_db.max(axis=(-2, -1), keepdims=True) - 80.0)
+        mfccs = librosa.feature.mfcc(
+            S=mel_db, 
+            n_mfcc=40  # More coefficients for better speaker differentiation
+        )
+        
+        # Delta and delta-delta features (velocity and acceleration)
+        mfcc_delta = np.stack([delta_features(m, 9, 1) for m in mfccs])
+        mfcc_delta2 = np.stack([delta_features(m, 9, 2) for m in mfccs])
+        
+        # Spectral features
+        spectral_contrast = librosa.feature.spectral_contrast(S=S, sr=sample_rate)
+        
+        # Spectral flatness (geometric / arithmetic mean of the power per frame), computed
+        # on the shared power spectrogram exactly as librosa.feature.spectral_flatness does
+        np.maximum(S_power, 1e-10, out=S_power)
+        spectral_flatness = np.exp(np.mean(np.log(S_power), axis=-2)) / np.mean(S_power, axis=-2)
+        
+        # Pitch features with better tracking
+        f0, voiced_flag, voiced_probs = _pyin(data, sr=sample_rate)
+        
+        # Fill one preallocated float32 block; columns past the features stay zero
+        # [0:40] MFCC mean, [40:80] MFCC std, [80:120] delta mean, [120:160] delta-delta mean,
+        # [160:167] spectral contrast mean, [167:169] flatness mean/std, [169:172] pitch
+        embeddings = np.zeros((len(data), embedding_dimension), dtype=np.float32)
+        embeddings[:, 0:40] = np.mean(mfccs, axis=-1)
+        embeddings[:, 40:80] = np.std(mfccs, axis=-1)
+        embeddings[:, 80:120] = np.mean(mfcc_delta, axis=-1)
+        embeddings[:, 120:160] = np.mean(mfcc_delta2, axis=-1)
+        embeddings[:, 160:167] = np.mean(spectral_contrast, axis=-1)
+        embeddings[:, 167] = np.mean(spectral_flatness, axis=-1)
+        embeddings[:, 168] = np.std(spectral_flatness, axis=-1)
+        for row, (f0_row, probs) in enumerate(zip(f0, voiced_probs)):
+            f0_mean, f0_std, _, _ = masked_mean_std_ptp(f0_row)
+            embeddings[row, 169:172] = f0_mean, f0_std, np.mean(probs) if len(probs) > 0 else 0
+        
+        # Normalize to unit length in place, so a dot product is the cosine similarity
+        embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True) + 1e-8
+        
+        return embeddings, f0, voiced_flag, voiced_probs
     
     def identify_speaker(self, audio_chunk: AudioChunk, session_id: str) -> Optional[str]:
         """Identify speaker from audio chunk with session context awareness."""
+        return self.identify_speakers_batch([audio_chunk], [session_id])[0]
+    
+    def identify_speakers(self, audio_chunks: List[AudioChunk], session_id: str) -> List[Optional[str]]:
+        """Identify the speakers of a batch of chunks from one session, e.g. its windows."""
+        return self.identify_speakers_batch(audio_chunks, [session_id] * len(audio_chunks))
+    
+    def identify_speakers_batch(self, audio_chunks: List[AudioChunk], session_ids: List[str]) -> List[Optional[str]]:
+        """Identify the speakers of a batch of chunks, each in its own session.
+        
+        Equivalent to match_embeddings over extract_speaker_embeddings, so the
+        assignments are the same as calling identify_speaker on each chunk in turn.
+        """
         try:
-            # Extract embedding for current audio
-            current_embedding = self.extract_speaker_embedding(audio_chunk)
-            
-            # First check if we have any speakers for this session
-            if session_id in self.session_speakers and len(self.session_speakers[session_id]) > 0:
-                # Calculate similarity with session-specific speakers first
-                session_similarities = []
-                session_indices = []
+            embeddings = self.extract_speaker_embeddings(audio_chunks)
+        except Exception as e:
+            logger.error(f"Error identifying speakers with WSI: {e}")
+            return [None] * len(audio_chunks)
+        return self.match_embeddings(embeddings, audio_chunks, session_ids)
+    
+    def extract_speaker_embeddings(self, audio_chunks: List[AudioChunk]) -> List[np.ndarray]:
+        """Extract the embeddings of a batch of chunks, in chunk order.
+        
+        Chunks of equal length and sample rate are extracted together in batches of up
+        to EXTRACTION_BATCH_SIZE, each batch being one pass of the librosa pipeline; the
+        batches run across worker processes. This doesn't touch the speaker registry,
+        so it can run off the event loop while matching stays on it.
+        """
+        try:
+            keys = [self._embedding_cache_key(chunk) for chunk in audio_chunks]
+            with self._extraction_lock:
+                pending = [i for i, key in enumerate(keys) if key not in self._embedding_cache]
+            
+            if len(pending) > 1:
+                groups: Dict[Tuple[int, int], List[int]] = {}
+                for i in pending:
+                    chunk = audio_chunks[i]
+                    groups.setdefault((chunk.sample_rate, len(chunk.data)), []).append(i)
                 
-                # Compare with speakers already identified in this session
-                for speaker_id in self.session_speakers[session_id]:
-                    if speaker_id in self.speaker_profiles:
-                        idx = self.speaker_ids.index(speaker_id)
-                        embedding = self.speaker_embeddings[idx]
-                        
-                        similarity = np.dot(current_embedding, embedding)
-                        session_similarities.append(similarity)
-                        session_indices.append(idx)
+                jobs = [
+                    members[start:start + self.EXTRACTION_BATCH_SIZE]
+                    for members in groups.values()
+                    for start in range(0, len(members), self.EXTRACTION_BATCH_SIZE)
+                ]
+                batches = [
+                    np.stack([np.asarray(audio_chunks[i].data, dtype=np.float32) for i in job])
+                    for job in jobs
+                ]
+                sample_rates = [audio_chunks[job[0]].sample_rate for job in jobs]
                 
-                # Check if we have a good match within session speakers
-                if session_similarities:
-                    max_similarity = max(session_similarities)
-                    if max_similarity >= self.similarity_threshold * 1.05:  # Slightly lower threshold for session speakers
-                        best_match_idx = session_indices[session_similarities.index(max_similarity)]
-                        speaker_id = self.speaker_ids[best_match_idx]
-                        self._update_speaker_profile(speaker_id, current_embedding)
-                        return speaker_id
-            
-            # If no match in session or no session speakers, check all speakers
-            if len(self.speaker_embeddings) == 0:
-                # First speaker ever
-                speaker_id = f"speaker_001"
-                self._add_new_speaker(speaker_id, current_embedding, audio_chunk)
-                self._add_to_session(session_id, speaker_id)
-                return speaker_id
-            
-            # Calculate similarity with all existing speakers
-            similarities = [np.dot(current_embedding, embedding) for embedding in self.speaker_embeddings]
-            
-            # Find best match
-            max_similarity = max(similarities)
-            best_match_idx = similarities.index(max_similarity)
-            
-            if max_similarity >= self.similarity_threshold:
-                # Match found
-                speaker_id = self.speaker_ids[best_match_idx]
-                self._update_speaker_profile(speaker_id, current_embedding)
-                self._add_to_session(session_id, speaker_id)
-                return speaker_id
-            else:
-                # New speaker
-                speaker_id = f"speaker_{len(self.speaker_embeddings) + 1:03d}"
-                self._add_new_speaker(speaker_id, current_embedding, audio_chunk)
-                self._add_to_session(session_id, speaker_id)
-                return speaker_id
+                if len(jobs) > 1 and settings.speaker_embedding_workers > 1:
+                    with self._extraction_lock:
+                        if self._extraction_pool is None:
+                            self._extraction_pool = ProcessPoolExecutor(
+                                max_workers=settings.speaker_embedding_workers,
+                                mp_context=multiprocessing.get_context("forkserver")
+                            )
+                    results = self._extraction_pool.map(
+                        self._compute_speaker_embeddings, batches, sample_rates, repeat(self.embedding_dimension)
+                    )
+                else:
+                    results = map(
+                        self._compute_speaker_embeddings, batches, sample_rates, repeat(self.embedding_dimension)
+                    )
                 
+                for job, (embeddings, _, _, _) in zip(jobs, results):
+                    for i, embedding in zip(job, embeddings):
+                        self._cache_embedding(keys[i], embedding)
         except Exception as e:
-            logger.error(f"Error identifying speaker with WSI: {e}")
-            return None
+            logger.error(f"Error batch-extracting WSI embeddings: {e}")
+        
+        # Anything not produced above (single chunk, failed batch) is extracted inline
+        return [self.extract_speaker_embedding(chunk) for chunk in audio_chunks]
+    
+    def match_embeddings(self, embeddings: List[np.ndarray], audio_chunks: List[AudioChunk],
+                         session_ids: List[str]) -> List[Optional[str]]:
+        """Assign extracted embeddings to speakers in chunk order (None where matching fails)."""
+        speaker_ids = []
+        for embedding, chunk, session_id in zip(embeddings, audio_chunks, session_ids):
+            try:
+                speaker_ids.append(self._match_speaker(embedding, chunk, session_id))
+            except Exception as e:
+                logger.error(f"Error identifying speaker with WSI: {e}")
+                speaker_ids.append(None)
+        return speaker_ids
+    
+    def _match_speaker(self, current_embedding: np.ndarray, audio_chunk: AudioChunk, session_id: str) -> str:
+        """Assign an embedding to a session speaker, a known speaker, or a new speaker."""
+        if len(self.speaker_ids) == 0:
+            # First speaker ever
+            speaker_id = f"speaker_001"
+            self._add_new_speaker(speaker_id, current_embedding, audio_chunk)
+            self._add_to_session(session_id, speaker_id)
+            return speaker_id
+        
+        query = np.asarray(current_embedding, dtype=np.float32)
+        
+        # First check speakers already identified in this session
+        session_indices = self.session_indices.get(session_id)
+        if session_indices is not None:
+            session_similarities = self._embedding_buffer[session_indices] @ query
+            best_session_idx = int(session_similarities.argmax())
+            if session_similarities[best_session_idx] >= self.similarity_threshold * 1.05:  # Slightly lower threshold for session speakers
+                speaker_id = self.speaker_ids[session_indices[best_session_idx]]
+                self._update_speaker_profile(speaker_id, current_embedding)
+                return speaker_id
+        
+        # If no match in session or no session speakers, check all speakers
+        candidates, similarities = self._scan_candidates(query)
+        best = int(similarities.argmax())
+        max_similarity = similarities[best]
+        
+        if max_similarity >= self.similarity_threshold:
+            # Match found
+            speaker_id = self.speaker_ids[candidates[best]]
+            self._update_speaker_profile(speaker_id, current_embedding)
+            self._add_to_session(session_id, speaker_id)
+            return speaker_id
+        else:
+            # New speaker
+            speaker_id = f"speaker_{len(self.speaker_ids) + 1:03d}"
+            self._add_new_speaker(speaker_id, current_embedding, audio_chunk)
+            self._add_to_session(session_id, speaker_id)
+            return speaker_id
     
     def _add_to_session(self, session_id: str, speaker_id: str):
         """Track speaker in the current session."""
-        if session_id not in self.session_speakers:
-            self.session_speakers[session_id] = set()
-        self.session_speakers[session_id].add(speaker_id)
+        index = self.id_to_index[speaker_id]
+        session_indices = self.session_indices.get(session_id)
+        if session_indices is None:
+            self.session_indices[session_id] = np.array([index], dtype=np.intp)
+        elif index not in session_indices:
+            self.session_indices[session_id] = np.append(session_indices, index)
     
     def _add_new_speaker(self, speaker_id: str, embedding: np.ndarray, audio_chunk: AudioChunk):
         """Add a new speaker to the tracking system."""
         # Create speaker profile with enhanced voice characteristics
-        characteristics = self._analyze_advanced_voice_characteristics(audio_chunk)
+        pitch = None
+        if self._last_pitch is not None and self._last_pitch[0] is audio_chunk.data:
+            pitch = self._last_pitch[1]
+        characteristics = self._analyze_advanced_voice_characteristics(audio_chunk, pitch)
         
         profile = SpeakerProfile(
             speaker_id=speaker_id,
@@ -236,8 +744,7 @@ class WSISpeakerIdentification:
         
         # Store in tracking lists
         self.speaker_profiles[speaker_id] = profile
-        self.speaker_embeddings.append(embedding)
-        self.speaker_ids.append(speaker_id)
+        self._append_embedding(speaker_id, embedding)
         
         # Save to disk for persistence
         self._save_speaker_profile(profile)
@@ -248,73 +755,77 @@ class WSISpeakerIdentification:
         """Update existing speaker profile with new embedding."""
         if speaker_id in self.speaker_profiles:
             profile = self.speaker_profiles[speaker_id]
-            idx = self.speaker_ids.index(speaker_id)
+            idx = self.id_to_index[speaker_id]
             
             # Adaptive learning rate based on confidence
             alpha = 0.1 * (1.0 - profile.confidence)
             
-            # Update embedding with moving average
-            updated_embedding = (1 - alpha) * profile.voice_embedding + alpha * new_embedding
-            
-            # Normalize
-            updated_embedding = updated_embedding / (np.linalg.norm(updated_embedding) + 1e-8)
-            
-            # Update in all storage locations
-            profile.voice_embedding = updated_embedding
-            self.speaker_embeddings[idx] = updated_embedding
+            # Moving average written in place into the speaker's float32 row,
+            # which profile.voice_embedding views
+            row = self._embedding_buffer[idx]
+            row *= 1.0 - alpha
+            row += alpha * new_embedding
+            row /= np.linalg.norm(row) + 1e-8
+            self._quantized_buffer[idx], self._quantized_scales[idx] = self._quantize(row)
+            if self._ann_index is not None:
+                # The index keeps the old vector until the next rebuild; reranking uses the new one
+                self._ann_stale_rows += 1
             
             # Update confidence (increasing with more samples)
             profile.confidence = min(1.0, profile.confidence + 0.02)
             
             # Save updated profile periodically (not on every update to avoid I/O overhead)
-            if profile.confidence % 0.1 < 0.021:  # Save roughly every 5 updates
+            updates = self._updates_since_save.get(speaker_id, 0) + 1
+            self._updates_since_save[speaker_id] = updates
+            if updates >= self.PROFILE_SAVE_INTERVAL:
                 self._save_speaker_profile(profile)
     
-    def _analyze_advanced_voice_characteristics(self, audio_chunk: AudioChunk) -> Dict[str, float]:
-        """Analyze advanced voice characteristics for detailed speaker profiling."""
+    def _analyze_advanced_voice_characteristics(self, audio_chunk: AudioChunk,
+                                                pitch: Optional[tuple] = None) -> Dict[str, float]:
+        """Analyze advanced voice characteristics for detailed speaker profiling.
+        
+        `pitch` is the pYIN output already computed for this chunk, if any.
+        """
         try:
+            data = np.ascontiguousarray(audio_chunk.data, dtype=np.float32)
+            
             # Pitch analysis with pYIN (more accurate than naive pitch tracking)
-            f0, voiced_flag, voiced_probs = librosa.pyin(
-                audio_chunk.data, 
-                fmin=librosa.note_to_hz('C2'), 
-                fmax=librosa.note_to_hz('C7'),
-                sr=audio_chunk.sample_rate
-            )
+            if pitch is None:
+                pitch = _pyin(data, sr=audio_chunk.sample_rate)
+            f0, voiced_flag, voiced_probs = pitch
             
-            valid_f0 = f0[~np.isnan(f0)]
-            pitch_mean = np.mean(valid_f0) if len(valid_f0) > 0 else 0
-            pitch_std = np.std(valid_f0) if len(valid_f0) > 0 else 0
-            pitch_range = np.ptp(valid_f0) if len(valid_f0) > 0 else 0
+            pitch_mean, pitch_std, pitch_range, _ = masked_mean_std_ptp(f0)
+            
+            # One STFT shared by HPSS, the spectral features and onset detection
+            D = librosa.stft(data)
+            S = np.abs(D)
             
             # Harmonics-to-noise ratio (voice quality measure)
-            y_harmonic, y_percussive = librosa.effects.hpss(audio_chunk.data)
+            D_harmonic, D_percussive = librosa.decompose.hpss(D)
+            y_harmonic = librosa.istft(D_harmonic, length=len(data))
+            y_percussive = librosa.istft(D_percussive, length=len(data))
             hnr = np.mean(y_harmonic**2) / (np.mean(y_percussive**2) + 1e-8)
             
             # Energy and dynamics
-            energy = np.sum(audio_chunk.data ** 2) / len(audio_chunk.data)
-            rms = np.sqrt(np.mean(audio_chunk.data ** 2))
+            energy = np.sum(data ** 2) / len(data)
+            rms = np.sqrt(np.mean(data ** 2))
             
             # Spectral characteristics
-            spec_centroid = np.mean(librosa.feature.spectral_centroid(
-                y=audio_chunk.data, sr=audio_chunk.sample_rate
-            ))
+            spec_centroid = np.mean(librosa.feature.spectral_centroid(S=S, sr=audio_chunk.sample_rate))
             
-            spec_bandwidth = np.mean(librosa.feature.spectral_bandwidth(
-                y=audio_chunk.data, sr=audio_chunk.sample_rate
-            ))
+            spec_bandwidth = np.mean(librosa.feature.spectral_bandwidth(S=S, sr=audio_chunk.sample_rate))
             
-            spec_rolloff = np.mean(librosa.feature.spectral_rolloff(
-                y=audio_chunk.data, sr=audio_chunk.sample_rate
-            ))
+            spec_rolloff = np.mean(librosa.feature.spectral_rolloff(S=S, sr=audio_chunk.sample_rate))
             
             # Speaking rate (using onset detection)
-            onset_env = librosa.onset.onset_strength(y=audio_chunk.data, sr=audio_chunk.sample_rate)
+            mel_db = librosa.power_to_db(librosa.feature.melspectrogram(S=S**2, sr=audio_chunk.sample_rate))
+            onset_env = librosa.onset.onset_strength(S=mel_db, sr=audio_chunk.sample_rate)
             onset_frames = librosa.onset.onset_detect(onset_envelope=onset_env, sr=audio_chunk.sample_rate)
-            duration = len(audio_chunk.data) / audio_chunk.sample_rate
+            duration = len(data) / audio_chunk.sample_rate
             speaking_rate = len(onset_frames) / duration if duration > 0 else 0
             
             # Voice clarity from zero crossing rate
-            zcr = np.mean(librosa.feature.zero_crossing_rate(audio_chunk.data))
+            zcr = np.mean(librosa.feature.zero_crossing_rate(data))
             clarity = 1.0 - min(1.0, zcr * 10)  # Lower ZCR often means clearer voice
             
             return {
@@ -342,17 +853,11 @@ class WSISpeakerIdentification:
         
         Note: This is a simplified approach and should be used as one signal among many.
         """
-        # Typical ranges (Hz): Adult male: 85-180, Adult female: 165-255
+        # Typical ranges (Hz): Adult male: 85-180, Adult female: 165-255.
+        # Piecewise linear through the class breakpoints, clamped outside them
         if pitch_mean <= 0:  # Invalid pitch
             return 0.5
-        elif pitch_mean < 85:
-            return 0.0
-        elif pitch_mean < 165:
-            return (pitch_mean - 85) / (165 - 85) * 0.5  # 0.0-0.5 range
-        elif pitch_mean < 255:
-            return 0.5 + (pitch_mean - 165) / (255 - 165) * 0.5  # 0.5-1.0 range
-        else:
-            return 1.0
+        return float(np.interp(pitch_mean, self.GENDER_PITCH_HZ, self.GENDER_LIKELIHOOD))
     
     def get_speaker_profile(self, speaker_id: str) -> Optional[SpeakerProfile]:
         """Get speaker profile by ID."""
@@ -375,34 +880,22 @@ class WSISpeakerIdentification:
     
     def get_session_speakers(self, session_id: str) -> List[str]:
         """Get speakers detected in a specific session."""
-        if session_id in self.session_speakers:
-            return list(self.session_speakers[session_id])
+        if session_id in self.session_indices:
+            return [self.speaker_ids[index] for index in self.session_indices[session_id]]
         return []
     
     def reset_session(self, session_id: str):
         """Reset speaker tracking for a specific session."""
-        if session_id in self.session_speakers:
-            del self.session_speakers[session_id]
+        if session_id in self.session_indices:
+            del self.session_indices[session_id]
             logger.info(f"Reset speaker tracking for session {session_id}")
     
     def reset_all(self):
         """Reset all speaker tracking data, but don't delete saved profiles."""
-        self.session_speakers.clear()
-        # Don't clear speaker_profiles, speaker_embeddings, speaker_ids as they're persistent
+        self.session_indices.clear()
+        # Don't clear speaker_profiles or the embedding matrix as they're persistent
         logger.info("Reset all active speaker tracking")
     
     def export_speaker_data(self) -> Dict[str, Dict]:
         """Export speaker data in a serializable format."""
-        data = {}
-        for speaker_id, profile in self.speaker_profiles.items():
-            # Convert numpy arrays to lists for JSON serialization
-            characteristics = profile.characteristics or {}
-            
-            data[speaker_id] = {
-                "speaker_id": speaker_id,
-                "voice_clone_id": profile.voice_clone_id,
-                "confidence": float(profile.confidence),
-                "characteristics": {k: float(v) if isinstance(v, (np.floating, float)) else v 
-                                   for k, v in characteristics.items()}
-            }
-        return data
+        return {speaker_id: self._profile_entry(profile) for speaker_id, profile in self.speaker_profiles.items()}
@@ -2,15 +2,21 @@ import asyncio
 import json
 import base64
 import time
+import statistics
 import wave
+from timeit import Timer
 import numpy as np
 from pathlib import Path
 
 from app.main import app
 from utils.audio_processing import AudioProcessingPipeline
 from models.audio_models import ProcessingRequest, AudioChunk, AudioFormat
+from utils.signal_gen import mix_tones
 from config.settings import settings
 
+# Seeded generator so the synthetic signal is reproducible across runs
+rng = np.random.default_rng(seed=0)
+
 
 async def test_audio_processing():
     """Test the audio processing pipeline with sample data."""
@@ -24,15 +30,11 @@ async def test_audio_processing():
     print("1. Creating synthetic audio data...")
     duration = 3.0  # seconds
     sample_rate = settings.sample_rate
-    t = np.linspace(0, duration, int(sample_rate * duration))
+    n_samples = int(sample_rate * duration)
 
-    # Generate sine wave (simulating speech)
+    # Generate sine wave (simulating speech) with some noise to make it more realistic
     frequency = 440  # A4 note
-    audio_data = 0.5 * np.sin(2 * np.pi * frequency * t)
-
-    # Add some noise to make it more realistic
-    noise = 0.1 * np.random.randn(len(audio_data))
-    audio_data += noise
+    audio_data = mix_tones((frequency,), (0.5,), sample_rate, n_samples, noise_sigma=0.1, rng=rng)
 
     # Create audio chunk
     audio_chunk = AudioChunk(
@@ -68,9 +70,12 @@ async def test_audio_processing():
     print(f"   Original Size: {len(audio_data)} samples")
     print(f"   Bytes Size: {len(audio_bytes)} bytes")
     print(f"   Reconstructed Size: {len(reconstructed_chunk.data)} samples")
-    print(
-        f"   Data Integrity: {'PASS' if np.allclose(audio_data, reconstructed_chunk.data, atol=1e-3) else 'FAIL'}\n"
-    )
+    # Max absolute error computed in a single scratch buffer (no allclose temporaries)
+    diff_buf = np.empty_like(audio_data)
+    np.subtract(audio_data, reconstructed_chunk.data, out=diff_buf)
+    np.abs(diff_buf, out=diff_buf)
+    integrity_ok = float(diff_buf.max()) < 1e-3
+    print(f"   Data Integrity: {'PASS' if integrity_ok else 'FAIL'}\n")
 
     # Test session management
     print("4. Testing session management...")
@@ -109,14 +114,14 @@ async def test_audio_processing():
         print(f"   Processing Count: {session_info.get('processing_count', 0)}")
 
     print("\n7. Performance Metrics...")
-    start_time = time.time()
-
-    # Simulate processing time
-    for i in range(5):
-        embedding = pipeline.speaker_service.extract_speaker_embedding(audio_chunk)
-
-    processing_time = (time.time() - start_time) / 5
-    print(f"   Average Embedding Extraction: {processing_time:.3f}s")
+    timer = Timer(lambda: pipeline.speaker_service.extract_speaker_embedding(audio_chunk))
+    timer.timeit(number=1)  # Warm-up, so first-call setup isn't in the mean
+
+    # autorange picks a call count that runs for at least 0.2s
+    number, total = timer.autorange()
+    processing_time = total / number
+    spread = statistics.stdev(t / number for t in timer.repeat(5, number))
+    print(f"   Average Embedding Extraction: {processing_time:.3f}s (stdev {spread:.4f}s, {number} calls)")
     print(f"   Estimated Real-time Factor: {duration/processing_time:.1f}x")
 
     print("\n8. WebSocket Message Format Test...")
@@ -12,9 +12,13 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 # Import our modules
 from models.audio_models import AudioChunk, AudioFormat, SpeakerProfile
-from services.speaker_identification import SpeakerIdentificationService
+from services.speaker_identification import get_service
+from utils.signal_gen import mix_tones, pcm16_bytes
 from config.settings import settings
 
+# Seeded generator so synthetic signals (and hence speaker IDs) are reproducible across runs
+rng = np.random.default_rng(seed=0)
+
 async def test_core_functionality():
     """Test core functionality without external API dependencies."""
     print("Testing Real-Time AI Dubbing System - Core Functionality")
@@ -33,27 +37,24 @@ async def test_core_functionality():
     print("2. Testing Audio Data Processing...")
     duration = 2.0  # seconds
     sample_rate = settings.sample_rate
-    t = np.linspace(0, duration, int(sample_rate * duration))
+    n_samples = int(sample_rate * duration)
     
     # Generate different types of synthetic audio for speaker testing
     speakers_data = []
     
     # Speaker 1: Male voice simulation (lower frequency)
     freq1 = 120  # Hz, typical male fundamental frequency
-    audio1 = 0.7 * np.sin(2 * np.pi * freq1 * t) + 0.3 * np.sin(2 * np.pi * freq1 * 2 * t)
-    audio1 += 0.1 * np.random.randn(len(audio1))  # Add noise
+    audio1 = mix_tones((freq1, freq1 * 2), (0.7, 0.3), sample_rate, n_samples, noise_sigma=0.1, rng=rng)  # With noise
     speakers_data.append((audio1, "Male Speaker"))
     
     # Speaker 2: Female voice simulation (higher frequency)
     freq2 = 220  # Hz, typical female fundamental frequency
-    audio2 = 0.6 * np.sin(2 * np.pi * freq2 * t) + 0.4 * np.sin(2 * np.pi * freq2 * 1.5 * t)
-    audio2 += 0.1 * np.random.randn(len(audio2))  # Add noise
+    audio2 = mix_tones((freq2, freq2 * 1.5), (0.6, 0.4), sample_rate, n_samples, noise_sigma=0.1, rng=rng)  # With noise
     speakers_data.append((audio2, "Female Speaker"))
     
     # Speaker 3: Child voice simulation (even higher frequency)
     freq3 = 300  # Hz, typical child fundamental frequency
-    audio3 = 0.5 * np.sin(2 * np.pi * freq3 * t) + 0.5 * np.sin(2 * np.pi * freq3 * 1.2 * t)
-    audio3 += 0.15 * np.random.randn(len(audio3))  # Add more noise
+    audio3 = mix_tones((freq3, freq3 * 1.2), (0.5, 0.5), sample_rate, n_samples, noise_sigma=0.15, rng=rng)  # With more noise
     speakers_data.append((audio3, "Child Speaker"))
     
     print(f"   Generated {len(speakers_data)} synthetic speaker samples")
@@ -63,15 +64,17 @@ async def test_core_functionality():
     
     # Test 3: Speaker Identification Service
     print("3. Testing Speaker Identification...")
-    speaker_service = SpeakerIdentificationService()
+    speaker_service = get_service()
     
+    # One clock read per test; chunks are spaced by their duration so timestamps are ordered
+    t0 = time.time()
     detected_speakers = []
     for i, (audio_data, speaker_name) in enumerate(speakers_data):
         # Create audio chunk
         audio_chunk = AudioChunk(
             data=audio_data,
             sample_rate=sample_rate,
-            timestamp=time.time(),
+            timestamp=t0 + i * duration,
             chunk_id=f"test_chunk_{i+1:03d}",
             format=AudioFormat.WAV
         )
@@ -98,7 +101,7 @@ async def test_core_functionality():
     test_chunk = AudioChunk(
         data=speakers_data[0][0],
         sample_rate=sample_rate,
-        timestamp=time.time(),
+        timestamp=t0,
         chunk_id="feature_test",
         format=AudioFormat.WAV
     )
@@ -117,14 +120,17 @@ async def test_core_functionality():
     # Test 5: Speaker Consistency
     print("5. Testing Speaker Consistency...")
     # Test the same speaker multiple times
+    t0 = time.time()
     same_speaker_ids = []
     for i in range(3):
         # Add slight variations to simulate real audio
-        varied_audio = speakers_data[0][0] + 0.05 * np.random.randn(len(speakers_data[0][0]))
+        varied_audio = rng.standard_normal(len(speakers_data[0][0]), dtype=np.float32)
+        varied_audio *= 0.05
+        varied_audio += speakers_data[0][0]
         varied_chunk = AudioChunk(
             data=varied_audio,
             sample_rate=sample_rate,
-            timestamp=time.time(),
+            timestamp=t0 + i * duration,
             chunk_id=f"consistency_test_{i}",
             format=AudioFormat.WAV
         )
@@ -140,35 +146,55 @@ async def test_core_functionality():
     
     # Test 6: Memory and Performance
     print("6. Testing Performance...")
-    start_time = time.time()
+    num_chunks = 10
+    num_workers = 4
     
-    # Process multiple chunks to test performance
-    processing_times = []
-    for i in range(10):
-        chunk_start = time.time()
-        
-        # Create random audio chunk
-        test_audio = 0.5 * np.random.randn(int(sample_rate * 0.5))  # 0.5 second chunk
-        test_chunk = AudioChunk(
-            data=test_audio,
-            sample_rate=sample_rate,
-            timestamp=time.time(),
-            chunk_id=f"perf_test_{i}",
-            format=AudioFormat.WAV
-        )
-        
-        # Process chunk
-        speaker_service.identify_speaker(test_chunk)
-        
-        processing_times.append(time.time() - chunk_start)
+    # Producer feeds chunks through a bounded queue (backpressure); workers extract
+    # embeddings in the default executor, and a single matcher consumes them in chunk
+    # order, since matching updates the shared speaker registry
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=2)
+    extracted = [loop.create_future() for _ in range(num_chunks)]
+    
+    async def produce_chunks():
+        t0 = time.time()
+        for i in range(num_chunks):
+            await queue.put((i, AudioChunk(
+                data=0.5 * rng.standard_normal(int(sample_rate * 0.5), dtype=np.float32),  # 0.5 second chunk
+                sample_rate=sample_rate,
+                timestamp=t0 + i * 0.5,
+                chunk_id=f"perf_test_{i}",
+                format=AudioFormat.WAV
+            )))
+        for _ in range(num_workers):
+            await queue.put(None)
+    
+    async def extract_chunks():
+        while (item := await queue.get()) is not None:
+            i, chunk = item
+            embedding = await loop.run_in_executor(None, speaker_service.extract_speaker_embedding, chunk)
+            extracted[i].set_result((embedding, chunk))
+    
+    async def match_chunks():
+        for future in extracted:
+            embedding, chunk = await future
+            speaker_service.match_embedding(embedding, chunk)
+    
+    start_time = time.perf_counter()
+    async with asyncio.TaskGroup() as tg:
+        tg.create_task(produce_chunks())
+        for _ in range(num_workers):
+            tg.create_task(extract_chunks())
+        tg.create_task(match_chunks())
+    elapsed = time.perf_counter() - start_time
+    avg_processing_time = elapsed / num_chunks
     
-    avg_processing_time = np.mean(processing_times)
     real_time_factor = 0.5 / avg_processing_time  # 0.5s audio / processing time
     
-    print(f"   Processed 10 chunks in {time.time() - start_time:.3f}s")
+    print(f"   Processed {num_chunks} chunks in {elapsed:.3f}s ({num_workers} workers)")
     print(f"   Average processing time: {avg_processing_time:.3f}s")
     print(f"   Real-time factor: {real_time_factor:.1f}x")
-    print(f"   Memory usage: {len(speaker_service.speaker_profiles)} speakers tracked")
+    print(f"   Memory usage: {len(speaker_service.speaker_ids)} speakers tracked")
     print("   ✓ Performance test completed\n")
     
     # Test 7: Data Structure Validation
@@ -177,7 +203,7 @@ async def test_core_functionality():
     # Test SpeakerProfile
     test_profile = SpeakerProfile(
         speaker_id="test_speaker_001",
-        voice_embedding=np.random.randn(29),
+        voice_embedding=rng.standard_normal(29),
         confidence=0.95,
         characteristics={
             "pitch_mean": 150.0,
@@ -192,7 +218,7 @@ async def test_core_functionality():
     
     # Test AudioChunk
     test_audio_chunk = AudioChunk(
-        data=np.random.randn(1024),
+        data=rng.standard_normal(1024, dtype=np.float32),
         sample_rate=16000,
         timestamp=time.time(),
         chunk_id="test_chunk",
@@ -209,7 +235,7 @@ async def test_core_functionality():
     print("8. Testing WebSocket Message Format...")
     
     # Simulate audio data as base64
-    audio_bytes = (speakers_data[0][0] * 32767).astype(np.int16).tobytes()
+    audio_bytes = pcm16_bytes(speakers_data[0][0])
     audio_b64 = base64.b64encode(audio_bytes).decode()
     
     # Create sample WebSocket messages
@@ -238,8 +264,9 @@ async def test_core_functionality():
     
     for msg_type, message in messages.items():
         print(f"   {msg_type} message format:")
-        print(f"     Size: {len(json.dumps(message))} characters")
-        print(f"     Valid JSON: {json.dumps(message) is not None}")
+        blob = json.dumps(message)
+        print(f"     Size: {len(blob)} characters")
+        print(f"     Valid JSON: {blob is not None}")
     
     print("   ✓ WebSocket message format validated\n")
     
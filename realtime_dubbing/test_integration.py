@@ -6,6 +6,8 @@ import base64
 import numpy as np
 from typing import Dict, Any
 
+from utils.wav_io import wav_bytes
+
 class RTDIntegrationTest:
     def __init__(self):
         self.server_url = "ws://localhost:8000/ws"
@@ -63,29 +65,27 @@ class RTDIntegrationTest:
                 # Send audio chunk
                 audio_chunk = {
                     "type": "audio_chunk",
-                    "data": audio_data.tolist(),
+                    # handle_audio_chunk decodes this and parses it as a WAV file
+                    "audio_data": base64.b64encode(wav_bytes(audio_data, sample_rate)).decode('ascii'),
                     "sampleRate": sample_rate,
                     "timestamp": 1234567890000
                 }
                 
                 await websocket.send(json.dumps(audio_chunk))
                 
-                # Wait for processed response
-                timeout_count = 0
-                while timeout_count < 10:  # 10 second timeout
-                    try:
-                        response = await asyncio.wait_for(websocket.recv(), timeout=1.0)
-                        data = json.loads(response)
-                        
-                        if data.get("type") == "dubbed_audio":
-                            return True
-                        elif data.get("type") == "error":
-                            print(f"Server error: {data.get('error')}")
-                            return False
+                # Wait for processed response under a single 10 second deadline
+                try:
+                    async with asyncio.timeout(10.0):
+                        async for response in websocket:
+                            data = json.loads(response)
                             
-                    except asyncio.TimeoutError:
-                        timeout_count += 1
-                        continue
+                            if data.get("type") == "dubbed_audio":
+                                return True
+                            elif data.get("type") == "error":
+                                print(f"Server error: {data.get('error')}")
+                                return False
+                except TimeoutError:
+                    pass
                 
                 return False
                 
@@ -95,25 +95,29 @@ class RTDIntegrationTest:
     
     def test_extension_files(self) -> bool:
         """Test that all required extension files exist"""
-        required_files = [
-            '/workspace/code/realtime_dubbing/extension/manifest.json',
-            '/workspace/code/realtime_dubbing/extension/popup.html',
-            '/workspace/code/realtime_dubbing/extension/popup.js',
-            '/workspace/code/realtime_dubbing/extension/background.js',
-            '/workspace/code/realtime_dubbing/extension/content.js',
-            '/workspace/code/realtime_dubbing/extension/audio-processor.js',
-            '/workspace/code/realtime_dubbing/extension/styles.css',
-            '/workspace/code/realtime_dubbing/extension/icons/icon-16.png',
-            '/workspace/code/realtime_dubbing/extension/icons/icon-48.png',
-            '/workspace/code/realtime_dubbing/extension/icons/icon-128.png'
-        ]
+        extension_dir = '/workspace/code/realtime_dubbing/extension'
+        required_files = {
+            'manifest.json', 'popup.html', 'popup.js', 'background.js',
+            'content.js', 'audio-processor.js', 'styles.css'
+        }
+        required_icons = {'icon-16.png', 'icon-48.png', 'icon-128.png'}
         
         import os
-        missing_files = []
         
-        for file_path in required_files:
-            if not os.path.exists(file_path):
-                missing_files.append(file_path)
+        def list_files(directory: str) -> set:
+            # One directory listing instead of a stat() per required file
+            try:
+                with os.scandir(directory) as entries:
+                    return {entry.name for entry in entries if entry.is_file()}
+            except FileNotFoundError:
+                return set()
+        
+        have_files = list_files(extension_dir)
+        have_icons = list_files(os.path.join(extension_dir, 'icons'))
+        missing_files = sorted(
+            [os.path.join(extension_dir, name) for name in required_files - have_files] +
+            [os.path.join(extension_dir, 'icons', name) for name in required_icons - have_icons]
+        )
         
         if missing_files:
             print(f"Missing extension files: {missing_files}")
@@ -146,25 +150,37 @@ class RTDIntegrationTest:
         
         print("Running RTD Integration Tests...\n")
         
+        # The tests are independent, so run them concurrently (file checks in threads)
+        outcomes = await asyncio.gather(
+            asyncio.to_thread(self.test_extension_files),
+            asyncio.to_thread(self.test_manifest_validity),
+            self.test_websocket_connection(),
+            self.test_audio_processing(),
+            return_exceptions=True
+        )
+        extension_files, manifest_validity, websocket_connection, audio_processing = (
+            outcome is True for outcome in outcomes
+        )
+        
         # Test 1: Extension files
         print("1. Testing extension files...")
-        results['extension_files'] = self.test_extension_files()
+        results['extension_files'] = extension_files
         print(f"   Result: {'PASS' if results['extension_files'] else 'FAIL'}\n")
         
         # Test 2: Manifest validity
         print("2. Testing manifest validity...")
-        results['manifest_validity'] = self.test_manifest_validity()
+        results['manifest_validity'] = manifest_validity
         print(f"   Result: {'PASS' if results['manifest_validity'] else 'FAIL'}\n")
         
         # Test 3: WebSocket connection (requires server)
         print("3. Testing WebSocket connection...")
-        results['websocket_connection'] = await self.test_websocket_connection()
+        results['websocket_connection'] = websocket_connection
         print(f"   Result: {'PASS' if results['websocket_connection'] else 'FAIL'}\n")
         
         # Test 4: Audio processing (requires server)
         if results['websocket_connection']:
             print("4. Testing audio processing...")
-            results['audio_processing'] = await self.test_audio_processing()
+            results['audio_processing'] = audio_processing
             print(f"   Result: {'PASS' if results['audio_processing'] else 'FAIL'}\n")
         else:
             print("4. Skipping audio processing test (server not available)\n")
@@ -6,7 +6,6 @@ This tests the new local Whisper implementation without any API dependencies.
 
 import asyncio
 import numpy as np
-import tempfile
 import soundfile as sf
 import sys
 import os
@@ -17,6 +16,13 @@ sys.path.append('/workspace/code/realtime_dubbing')
 from services.whisper_speech_service import WhisperSpeechService
 from models.audio_models import SpeechRecognitionResult
 
+# Seeded generator so the synthetic signal is reproducible across runs
+rng = np.random.default_rng(seed=0)
+
+# 2 seconds of 16 kHz float32 silence, shared read-only across runs
+_SILENCE_16K_2S = np.zeros(32000, dtype=np.float32)
+_SILENCE_16K_2S.flags.writeable = False
+
 async def test_local_whisper():
     """Test local Whisper speech recognition."""
     print("🎉 Testing Local Whisper Speech-to-Text (100% Free!)")
@@ -44,8 +50,9 @@ async def test_local_whisper():
         )
         
         # Add some noise to make it more realistic
-        noise = np.random.normal(0, 0.05, audio_signal.shape)
-        audio_signal = audio_signal + noise
+        noise = rng.standard_normal(audio_signal.shape)
+        noise *= 0.05
+        audio_signal += noise
         
         # Normalize
         audio_signal = audio_signal / np.max(np.abs(audio_signal))
@@ -65,8 +72,7 @@ async def test_local_whisper():
         
         # Test with real silence (should produce empty result)
         print("\n🔇 Testing with silence...")
-        silence = np.zeros(int(sample_rate * 2.0))  # 2 seconds of silence
-        silence_result = await service.recognize_audio_chunk(silence, "en")
+        silence_result = await service.recognize_audio_chunk(_SILENCE_16K_2S, "en")
         print(f"   Silence Text: '{silence_result.text}'")
         print(f"   Silence Confidence: {silence_result.confidence:.2f}")
         
@@ -20,6 +20,7 @@ from services.wsi_speaker_identification import WSISpeakerIdentification
 from services.enhanced_voice_service import EnhancedVoiceService
 from services.voice_management import VoiceManagementSystem
 from models.audio_models import AudioChunk, AudioFormat
+from utils.wav_io import wav_bytes
 
 # Configure logging
 logging.basicConfig(
@@ -71,13 +72,7 @@ async def main():
     # 3. Test voice quality analysis
     logger.info("Analyzing voice quality...")
     # Convert AudioChunk to bytes (simplified for testing)
-    import soundfile as sf
-    from io import BytesIO
-    
-    output_io = BytesIO()
-    sf.write(output_io, test_audio.data, test_audio.sample_rate, format='WAV')
-    output_io.seek(0)
-    audio_bytes = output_io.read()
+    audio_bytes = wav_bytes(test_audio.data, test_audio.sample_rate)
     
     quality_metrics = await voice_service.analyze_voice_quality(audio_bytes, sample_rate)
     logger.info(f"Voice quality metrics: {quality_metrics}")
@@ -5,6 +5,7 @@ Tests both speech recognition and translation functionality.
 """
 
 import asyncio
+import functools
 import sys
 import os
 import numpy as np
@@ -19,11 +20,19 @@ from services.whisper_speech_service import WhisperSpeechService, WhisperTransla
 from services.speech_services import SpeechService, TranslationService
 from models.audio_models import AudioChunk, AudioFormat
 from config.settings import settings
+from utils.signal_gen import mix_tones
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+@functools.lru_cache(maxsize=8)
+def _test_tone(duration: float, sample_rate: int) -> np.ndarray:
+    """440 Hz sine wave (A note) at 0.3 amplitude, generated once per shape."""
+    audio = mix_tones((440.0,), (0.3,), sample_rate, int(duration * sample_rate))
+    audio.flags.writeable = False
+    return audio
+
 class WhisperTestSuite:
     """Test suite for OpenAI Whisper implementation."""
     
@@ -31,11 +40,8 @@ class WhisperTestSuite:
         self.results = []
         
     def create_test_audio(self, duration: float = 2.0, sample_rate: int = 16000) -> np.ndarray:
-        """Create test audio signal (sine wave)."""
-        t = np.linspace(0, duration, int(duration * sample_rate), False)
-        # Create a 440 Hz sine wave (A note)
-        audio = np.sin(2 * np.pi * 440 * t) * 0.3
-        return audio.astype(np.float32)
+        """Create test audio signal (sine wave), shared read-only between calls."""
+        return _test_tone(duration, sample_rate)
     
     async def test_whisper_speech_service_direct(self):
         """Test WhisperSpeechService directly."""
@@ -0,0 +1,212 @@
+import numpy as np
+import numba
+
+# fastmath without the "no NaNs" flag - the pitch kernels rely on isnan() checks
+_FASTMATH = {"nsz", "arcp", "contract", "afn", "reassoc"}
+
+
+@numba.njit(cache=True, fastmath=_FASTMATH)
+def delta_features(features, width=9, order=1):
+    """Delta features along the time axis, matching librosa.feature.delta(mode='interp').
+
+    Interior frames use the Savitzky-Golay derivative weights for a window of
+    `width` frames; edge frames take the value of the nearest full window, which
+    is what the 'interp' mode yields for polynomial order == derivative order.
+    Only order 1 (velocity) and order 2 (acceleration) are supported.
+    """
+    n_rows, n_frames = features.shape
+    half = width // 2
+    if width < 3 or width % 2 == 0 or n_frames < width:
+        raise ValueError("width must be odd, at least 3, and not exceed the number of frames")
+    if order != 1 and order != 2:
+        raise ValueError("order must be 1 or 2")
+
+    # Least-squares derivative weights over offsets -half..half
+    weights = np.empty(width)
+    if order == 1:
+        norm = 0.0
+        for k in range(width):
+            n = k - half
+            norm += n * n
+        for k in range(width):
+            weights[k] = (k - half) / norm
+    else:
+        mean_sq = 0.0
+        for k in range(width):
+            n = k - half
+            mean_sq += n * n
+        mean_sq /= width
+        norm = 0.0
+        for k in range(width):
+            n = k - half
+            norm += (n * n - mean_sq) ** 2
+        for k in range(width):
+            n = k - half
+            weights[k] = 2.0 * (n * n - mean_sq) / norm
+
+    out = np.empty((n_rows, n_frames), dtype=features.dtype)
+    for r in range(n_rows):
+        for t in range(half, n_frames - half):
+            acc = 0.0
+            for k in range(width):
+                acc += weights[k] * features[r, t - half + k]
+            out[r, t] = acc
+
+        # Edge frames repeat the nearest full-window value
+        for t in range(half):
+            out[r, t] = out[r, half]
+        for t in range(n_frames - half, n_frames):
+            out[r, t] = out[r, n_frames - half - 1]
+
+    return out
+
+
+@numba.njit(cache=True, fastmath=_FASTMATH)
+def masked_mean_std_ptp(values):
+    """Mean, standard deviation and peak-to-peak of the non-NaN entries in one pass.
+
+    Returns (mean, std, ptp, count); all statistics are 0.0 when no entry is valid.
+    """
+    count = 0
+    total = 0.0
+    total_sq = 0.0
+    lo = np.inf
+    hi = -np.inf
+    for i in range(values.size):
+        v = values[i]
+        if np.isnan(v):
+            continue
+        count += 1
+        total += v
+        total_sq += v * v
+        if v < lo:
+            lo = v
+        if v > hi:
+            hi = v
+
+    if count == 0:
+        return 0.0, 0.0, 0.0, 0
+
+    mean = total / count
+    variance = max(total_sq / count - mean * mean, 0.0)
+    return mean, np.sqrt(variance), hi - lo, count
+
+
+@numba.njit(cache=True, fastmath=_FASTMATH)
+def downmix_mono(data, scale=1.0):
+    """Average the channels of a (samples, channels) array into float32 mono.
+
+    Samples are multiplied by `scale` first, so integer PCM (e.g. int16 with
+    scale 1/32768) is converted to float in the same pass. Returns (mono, peak)
+    where peak is the largest absolute mono sample, tracked in the same pass so
+    normalizing afterwards doesn't need another scan.
+    """
+    n_samples, n_channels = data.shape
+    mono = np.empty(n_samples, dtype=np.float32)
+    peak = 0.0
+    for i in range(n_samples):
+        acc = 0.0
+        for c in range(n_channels):
+            acc += data[i, c]
+        sample = np.float32(acc * scale / n_channels)
+        mono[i] = sample
+        if abs(sample) > peak:
+            peak = abs(sample)
+    return mono, peak
+
+
+@numba.njit(cache=True, fastmath=_FASTMATH)
+def abs_max(audio):
+    """Largest absolute sample of a 1-D signal (0 for an empty one).
+
+    Keeps eight independent running maxima so the loop vectorizes instead of
+    serializing on a single compare-and-select chain.
+    """
+    lanes = np.zeros(8, dtype=audio.dtype)
+    n_blocked = audio.size - audio.size % 8
+    for i in range(0, n_blocked, 8):
+        for k in range(8):
+            value = abs(audio[i + k])
+            if value > lanes[k]:
+                lanes[k] = value
+    peak = lanes.max()
+    for i in range(n_blocked, audio.size):
+        value = abs(audio[i])
+        if value > peak:
+            peak = value
+    return peak
+
+
+@numba.njit(cache=True, fastmath=_FASTMATH)
+def peak_normalize(audio, peak=-1.0):
+    """Scale a 1-D signal in place so its largest absolute sample is 1.
+
+    Pass a known `peak` to skip the scan for it; silent signals are left unchanged.
+    """
+    if peak < 0.0:
+        peak = abs_max(audio)
+    if peak > 0.0:
+        scale = audio.dtype.type(1.0 / peak)
+        for i in range(audio.size):
+            audio[i] *= scale
+    return audio
+
+
+@numba.njit(cache=True, fastmath=_FASTMATH)
+def trim_bounds(audio, threshold, frame_length=512):
+    """Sample range (start, end) of a (samples, channels) signal without leading and trailing silence.
+
+    A frame is silent when its RMS over all channels is below `threshold` (in sample
+    units). Only the silent ends are scanned, inward from each side until the first
+    loud frame, and each cut is then moved outward to the nearest zero crossing of
+    the first channel (at most one frame) so it doesn't click. All-silent input is
+    kept whole.
+    """
+    n_samples, n_channels = audio.shape
+    threshold_sq = threshold * threshold * n_channels
+
+    start = n_samples
+    for f0 in range(0, n_samples, frame_length):
+        f1 = min(f0 + frame_length, n_samples)
+        acc = 0.0
+        for i in range(f0, f1):
+            for c in range(n_channels):
+                acc += float(audio[i, c]) * float(audio[i, c])
+        if acc >= threshold_sq * (f1 - f0):
+            start = f0
+            break
+    if start == n_samples:
+        return 0, n_samples
+
+    end = start
+    for f1 in range(n_samples, start, -frame_length):
+        f0 = max(f1 - frame_length, start)
+        acc = 0.0
+        for i in range(f0, f1):
+            for c in range(n_channels):
+                acc += float(audio[i, c]) * float(audio[i, c])
+        if acc >= threshold_sq * (f1 - f0):
+            end = f1
+            break
+
+    # Widen each cut to the nearest sign change
+    limit = max(start - frame_length, 0)
+    while start > limit and float(audio[start - 1, 0]) * float(audio[start, 0]) > 0.0:
+        start -= 1
+    limit = min(end + frame_length, n_samples)
+    while end < limit and float(audio[end - 1, 0]) * float(audio[end, 0]) > 0.0:
+        end += 1
+    return start, end
+
+
+# Compile on import so the first audio chunk doesn't pay the JIT cost
+for _dtype in (np.float32, np.float64):
+    delta_features(np.zeros((2, 9), dtype=_dtype), 9, 1)
+    delta_features(np.zeros((2, 9), dtype=_dtype), 9, 2)
+    masked_mean_std_ptp(np.zeros(2, dtype=_dtype))
+    downmix_mono(np.zeros((2, 2), dtype=_dtype), 1.0)
+    abs_max(np.zeros(2, dtype=_dtype))
+    peak_normalize(np.zeros(2, dtype=_dtype))
+    peak_normalize(np.zeros(2, dtype=_dtype), 1.0)
+downmix_mono(np.zeros((2, 2), dtype=np.int16), 1.0 / 32768)
+trim_bounds(np.zeros((2, 1), dtype=np.int16), 1.0)
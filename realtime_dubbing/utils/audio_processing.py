@@ -1,12 +1,12 @@
 import asyncio
+import bisect
 import json
 import time
-import uuid
 import logging
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
 from typing import Dict, Optional, List, Tuple
 import numpy as np
-import librosa
-import soundfile as sf
 from io import BytesIO
 
 import sys
@@ -16,6 +16,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from models.audio_models import (
     AudioChunk, 
     AudioFormat, 
+    SpeakerProfile,
     ProcessingRequest, 
     ProcessingResponse, 
     ProcessingStatus,
@@ -27,13 +28,73 @@ from services.speech_services import SpeechService, TranslationService
 from services.enhanced_voice_service import EnhancedVoiceService
 from services.wsi_speaker_identification import WSISpeakerIdentification
 from services.voice_management import VoiceManagementSystem
+from utils.audio_kernels import downmix_mono, peak_normalize, trim_bounds
+from utils.ids import fast_request_id
+from utils.wav_io import int16_wav_bytes, pcm16_le, wav_bytes
 from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+@dataclass
+class _PipelineJob:
+    """Per-request state handed from one pipeline stage to the next."""
+    request: ProcessingRequest
+    request_id: str
+    start_time: float
+    future: asyncio.Future
+    speaker_id: Optional[str] = None
+    actor_id: Optional[str] = None
+    speaker_profile: Optional[SpeakerProfile] = None
+    speech_result: Optional[SpeechRecognitionResult] = None
+    translation_result: Optional[TranslationResult] = None
+
 class AudioProcessingPipeline:
     """Main audio processing pipeline for real-time dubbing."""
     
+    # Batched requests are collected for up to BATCH_MAX_WAIT seconds or BATCH_MAX_SIZE chunks
+    BATCH_MAX_SIZE = 8
+    BATCH_MAX_WAIT = 0.05
+    
+    # Speech recognition requests queue per duration bucket (<10s, 10-30s, >30s) and
+    # language; a bucket is decoded once it holds BATCH_BUCKET_SIZES chunks or its
+    # oldest chunk has waited BATCH_BUCKET_WAITS seconds. Chunks over 30s are
+    # transcribed one at a time anyway, so that bucket never waits.
+    BATCH_BUCKET_EDGES = (10.0, 30.0)
+    BATCH_BUCKET_SIZES = (8, 8, 1)
+    BATCH_BUCKET_WAITS = (0.05, 0.1, 0.0)
+    # Flushed buckets are dispatched as tasks so the worker keeps collecting while one
+    # decodes; only one batch runs at a time, since Whisper's kv-cache hooks on the
+    # shared model can't serve two decodes at once
+    BATCH_MAX_INFLIGHT = 1
+    
+    # Requests flow ASR -> translation -> synthesis through bounded queues, so one
+    # chunk's synthesis overlaps the next chunk's translation and recognition. The
+    # ASR stage gets one worker per batch slot so full recognition batches can form.
+    STAGE_QUEUE_SIZE = 16
+    TRANSLATE_WORKERS = 2
+    TTS_WORKERS = 2
+    
+    # Recent translations keyed on (stripped text, source, target); short repeated
+    # utterances skip the translation call until the entry expires
+    TRANSLATION_CACHE_SIZE = 2048
+    TRANSLATION_CACHE_TTL = 600.0  # seconds
+    
+    # Resolved synthesis voices per session and speaker; beyond VOICE_CACHE_SIZE entries
+    # the lowest phi = uses * (1 + VOICE_RECENCY_WEIGHT * recency) are evicted
+    VOICE_CACHE_SIZE = 16
+    VOICE_RECENCY_WEIGHT = 0.5
+    
+    # Chunks quieter than this RMS are treated as silence and skip recognition
+    SILENCE_RMS = 1e-4
+    
+    # Leading/trailing audio of synthesized WAV below this level (dBFS frame RMS) is trimmed
+    TRIM_TOP_DB = 60.0
+    
+    # parse_audio_data reads interleaved samples into pooled scratch buffers, since only
+    # the downmixed copy outlives the call; larger reads get a one-off buffer
+    SCRATCH_POOL_SIZE = 3
+    SCRATCH_MAX_BYTES = 4 * 1024 * 1024
+    
     def __init__(self):
         # Initialize services
         self.speech_service = SpeechService()
@@ -44,162 +105,518 @@ class AudioProcessingPipeline:
             speaker_service=self.speaker_service,
             voice_service=self.voice_service
         )
+        self.voice_management.add_update_listener(self.invalidate_voices)
         
         # Processing state
-        self.active_sessions: Dict[str, Dict] = {}
+        # Least recently active first; sessions idle for settings.session_ttl seconds,
+        # or beyond settings.max_active_sessions, are dropped as others are updated
+        self.active_sessions: OrderedDict = OrderedDict()
+        # (audio, language, future) recognition requests for the batching worker,
+        # which is started on first use since there may be no running loop yet
         self.processing_queue = asyncio.Queue()
+        self._batch_task: Optional[asyncio.Task] = None
+        # (audio chunk, session, future) speaker identification requests, batched the same way
+        self._speaker_queue: asyncio.Queue = asyncio.Queue()
+        self._speaker_batch_task: Optional[asyncio.Task] = None
+        
+        # Stage queues and workers, also started on first use
+        self._asr_queue: asyncio.Queue = asyncio.Queue(maxsize=self.STAGE_QUEUE_SIZE)
+        self._translate_queue: asyncio.Queue = asyncio.Queue(maxsize=self.STAGE_QUEUE_SIZE)
+        self._tts_queue: asyncio.Queue = asyncio.Queue(maxsize=self.STAGE_QUEUE_SIZE)
+        self._stage_tasks: List[asyncio.Task] = []
+        
+        # LRU of (expires_at, TranslationResult), oldest first
+        self._translation_cache: OrderedDict = OrderedDict()
+        
+        # session_id -> (speaker_id, actor_id) -> (voice_id, last_used, uses); entries are
+        # only added once synthesis succeeds, so every cached session is in active_sessions
+        self._voice_cache: Dict[str, Dict[Tuple[Optional[str], Optional[str]], Tuple[str, float, int]]] = {}
+        
+        # Free byte buffers for parse_audio_data (list pop/append are atomic, so a
+        # call from another thread just takes a different buffer)
+        self._scratch_pool: List[np.ndarray] = []
         
     async def process_audio_chunk(self, request: ProcessingRequest) -> ProcessingResponse:
         """Process a single audio chunk through the complete pipeline."""
-        start_time = time.time()
-        request_id = str(uuid.uuid4())
+        self._ensure_stages()
         
-        try:
-            logger.info(f"Processing audio chunk {request_id} for session {request.session_id}")
-            
-            # Step 1: Speaker Identification (with actor context if enabled)
-            if request.actor_aware and request.content_id:
-                # Use voice management for actor-aware speaker identification
-                speaker_id, actor_id = await self.voice_management.identify_speaker_with_actor_context(
-                    request.audio_chunk,
-                    request.session_id,
-                    request.content_id
-                )
-            else:
-                # Use regular speaker identification
-                speaker_id = self.speaker_service.identify_speaker(request.audio_chunk, request.session_id)
-                actor_id = None
-                
-                # Try to find associated actor if speaker was identified
-                if speaker_id:
-                    actor_profile = await self.voice_management.get_actor_for_speaker(speaker_id)
-                    actor_id = actor_profile.actor_id if actor_profile else None
-            
-            # Get speaker profile
-            speaker_profile = self.speaker_service.get_speaker_profile(speaker_id) if speaker_id else None
-            
-            # Step 2: Speech Recognition
-            speech_result = await self.speech_service.recognize_audio_chunk(
-                request.audio_chunk.data,
-                request.source_language or "auto"
-            )
-            
-            if not speech_result.text.strip():
-                # No speech detected, return empty response
-                return ProcessingResponse(
-                    request_id=request_id,
-                    status=ProcessingStatus.COMPLETED,
-                    processing_time=time.time() - start_time,
-                    speaker_id=speaker_id,
-                    actor_id=actor_id
-                )
-            
-            # Step 3: Translation
-            translation_result = await self.translate_service.translate_text(
-                speech_result.text,
-                request.target_language,
-                speech_result.language if speech_result.language != "unknown" else None
-            )
-            
-            # Step 4: Voice Synthesis (with advanced voice settings if preserve_voice enabled)
-            voice_id = None
-            if request.preserve_voice:
-                # Try to get best voice for actor if actor was identified
-                if actor_id:
-                    voice_id = await self.voice_management.get_best_voice_for_actor(actor_id)
-                
-                # If no actor voice, try speaker's voice
-                if not voice_id and speaker_profile and speaker_profile.voice_clone_id:
-                    voice_id = speaker_profile.voice_clone_id
-            
-            synthesis_result = await self.voice_service.synthesize_speech(
-                text=translation_result.translated_text,
-                voice_id=voice_id,
-                speaker_profile=speaker_profile if request.preserve_voice else None,
-                optimize_settings=request.preserve_voice
+        job = _PipelineJob(
+            request=request,
+            request_id=fast_request_id(),
+            start_time=time.time(),
+            future=asyncio.get_running_loop().create_future()
+        )
+        logger.info(f"Processing audio chunk {job.request_id} for session {request.session_id}")
+        
+        # Waits here when the pipeline is saturated (backpressure)
+        await self._asr_queue.put(job)
+        return await job.future
+    
+    def _ensure_stages(self):
+        """Start the stage workers if they aren't running."""
+        if self._stage_tasks and not any(task.done() for task in self._stage_tasks):
+            return
+        for task in self._stage_tasks:
+            task.cancel()
+        
+        stages = (
+            [(self._asr_queue, self._asr_stage)] * self.BATCH_MAX_SIZE +
+            [(self._translate_queue, self._translate_stage)] * self.TRANSLATE_WORKERS +
+            [(self._tts_queue, self._tts_stage)] * self.TTS_WORKERS
+        )
+        self._stage_tasks = [asyncio.create_task(self._run_stage(queue, stage)) for queue, stage in stages]
+    
+    async def _run_stage(self, queue: asyncio.Queue, stage):
+        """Feed jobs from a queue to a stage forever, failing the job (not the worker) on errors."""
+        while True:
+            job = await queue.get()
+            if job.future.done():
+                continue  # The caller went away
+            try:
+                await stage(job)
+            except Exception as e:
+                logger.error(f"Error processing audio chunk {job.request_id}: {e}")
+                self._finish_job(job, ProcessingResponse(
+                    request_id=job.request_id,
+                    status=ProcessingStatus.FAILED,
+                    error_message=str(e),
+                    processing_time=time.time() - job.start_time
+                ))
+    
+    def _finish_job(self, job: _PipelineJob, response: ProcessingResponse):
+        """Hand the response to the waiting caller."""
+        if not job.future.done():
+            job.future.set_result(response)
+    
+    async def _asr_stage(self, job: _PipelineJob):
+        """Speaker identification and speech recognition."""
+        request = job.request
+        
+        # Step 1: Speaker Identification (with actor context if enabled)
+        if request.actor_aware and request.content_id:
+            # Use voice management for actor-aware speaker identification
+            job.speaker_id, job.actor_id = await self.voice_management.identify_speaker_with_actor_context(
+                request.audio_chunk,
+                request.session_id,
+                request.content_id
             )
+        else:
+            # Use regular speaker identification
+            job.speaker_id = await self._identify_speaker(request.audio_chunk, request.session_id)
             
-            # Step 5: Update session state
+            # Try to find associated actor if speaker was identified
+            if job.speaker_id:
+                actor_profile = await self.voice_management.get_actor_for_speaker(job.speaker_id)
+                job.actor_id = actor_profile.actor_id if actor_profile else None
+        
+        # Get speaker profile
+        job.speaker_profile = self.speaker_service.get_speaker_profile(job.speaker_id) if job.speaker_id else None
+        
+        # Step 2: Speech Recognition (skipped for silent chunks)
+        data = request.audio_chunk.data
+        if data.size == 0 or np.sqrt(np.dot(data, data) / data.size) < self.SILENCE_RMS:
+            job.speech_result = None
+        else:
+            job.speech_result = await self._recognize(data, request.source_language or "auto")
+        
+        if job.speech_result is None or not job.speech_result.text.strip():
+            # No speech detected, return empty response
+            self._finish_job(job, ProcessingResponse(
+                request_id=job.request_id,
+                status=ProcessingStatus.COMPLETED,
+                processing_time=time.time() - job.start_time,
+                speaker_id=job.speaker_id,
+                actor_id=job.actor_id
+            ))
+            return
+        
+        await self._translate_queue.put(job)
+    
+    async def _translate_stage(self, job: _PipelineJob):
+        """Translation of the recognized text."""
+        speech_result = job.speech_result
+        
+        # Step 3: Translation
+        job.translation_result = await self._translate(
+            speech_result.text,
+            job.request.target_language,
+            speech_result.language if speech_result.language != "unknown" else None
+        )
+        
+        if not job.translation_result.translated_text.strip():
+            # Nothing to synthesize - skip the TTS stage
             self._update_session_state(
-                session_id=request.session_id, 
-                speaker_id=speaker_id, 
-                actor_id=actor_id,
-                speech_result=speech_result, 
-                translation_result=translation_result
+                session_id=job.request.session_id,
+                speaker_id=job.speaker_id,
+                actor_id=job.actor_id,
+                speech_result=speech_result,
+                translation_result=job.translation_result
             )
-            
-            processing_time = time.time() - start_time
-            
-            logger.info(f"Completed processing {request_id} in {processing_time:.3f}s")
-            
-            return ProcessingResponse(
-                request_id=request_id,
+            self._finish_job(job, ProcessingResponse(
+                request_id=job.request_id,
                 status=ProcessingStatus.COMPLETED,
-                processed_audio=synthesis_result.audio_data,
                 original_text=speech_result.text,
-                translated_text=translation_result.translated_text,
-                processing_time=processing_time,
-                speaker_id=speaker_id,
-                actor_id=actor_id,
-                voice_id=synthesis_result.voice_id
-            )
+                translated_text="",
+                processing_time=time.time() - job.start_time,
+                speaker_id=job.speaker_id,
+                actor_id=job.actor_id
+            ))
+            return
+        
+        await self._tts_queue.put(job)
+    
+    async def _translate(self, text: str, target_language: str, source_language: Optional[str]) -> TranslationResult:
+        """Translate text, reusing a recent translation of the same utterance."""
+        key = (text.strip(), source_language, target_language)
+        now = time.monotonic()
+        
+        cached = self._translation_cache.get(key)
+        if cached is not None:
+            expires_at, result = cached
+            if expires_at > now:
+                self._translation_cache.move_to_end(key)
+                return result
+            del self._translation_cache[key]
+        
+        result = await self.translate_service.translate_text(text, target_language, source_language)
+        self._translation_cache[key] = (now + self.TRANSLATION_CACHE_TTL, result)
+        if len(self._translation_cache) > self.TRANSLATION_CACHE_SIZE:
+            self._translation_cache.popitem(last=False)
+        return result
+    
+    async def _tts_stage(self, job: _PipelineJob):
+        """Voice synthesis and session bookkeeping."""
+        request = job.request
+        speaker_profile = job.speaker_profile
+        
+        # Step 4: Voice Synthesis (with advanced voice settings if preserve_voice enabled)
+        voice_id = None
+        if request.preserve_voice:
+            voice_id = await self._resolve_voice(job)
+        
+        synthesis_result = await self.voice_service.synthesize_speech(
+            text=job.translation_result.translated_text,
+            voice_id=voice_id,
+            speaker_profile=speaker_profile if request.preserve_voice else None,
+            optimize_settings=request.preserve_voice
+        )
+        if voice_id:
+            self._remember_voice(job, voice_id)
+        
+        # Step 5: Update session state
+        self._update_session_state(
+            session_id=request.session_id, 
+            speaker_id=job.speaker_id, 
+            actor_id=job.actor_id,
+            speech_result=job.speech_result, 
+            translation_result=job.translation_result
+        )
+        
+        processing_time = time.time() - job.start_time
+        
+        logger.info(f"Completed processing {job.request_id} in {processing_time:.3f}s")
+        
+        self._finish_job(job, ProcessingResponse(
+            request_id=job.request_id,
+            status=ProcessingStatus.COMPLETED,
+            processed_audio=self._trim_silence(synthesis_result.audio_data),
+            original_text=job.speech_result.text,
+            translated_text=job.translation_result.translated_text,
+            processing_time=processing_time,
+            speaker_id=job.speaker_id,
+            actor_id=job.actor_id,
+            voice_id=synthesis_result.voice_id
+        ))
+    
+    def _take_scratch(self, n_bytes: int) -> np.ndarray:
+        """A byte buffer of at least n_bytes, from the pool when one is free."""
+        try:
+            scratch = self._scratch_pool.pop()
+        except IndexError:
+            scratch = None
+        if scratch is None or scratch.size < n_bytes:
+            scratch = np.empty(n_bytes, dtype=np.uint8)
+        return scratch
+    
+    def _release_scratch(self, scratch: np.ndarray):
+        """Return a buffer to the pool, unless the pool is full or the buffer is oversized."""
+        if scratch.size <= self.SCRATCH_MAX_BYTES and len(self._scratch_pool) < self.SCRATCH_POOL_SIZE:
+            self._scratch_pool.append(scratch)
+    
+    def _trim_silence(self, audio: bytes) -> bytes:
+        """Drop leading and trailing silence from 16-bit WAV audio; anything else is returned as is."""
+        if not audio.startswith(b"RIFF"):
+            return audio
+        import soundfile as sf
+        
+        try:
+            with sf.SoundFile(BytesIO(audio)) as audio_file:
+                if audio_file.subtype != 'PCM_16':
+                    return audio
+                sample_rate = audio_file.samplerate
+                pcm = audio_file.read(dtype='int16', always_2d=True)
+        except Exception as e:
+            logger.error(f"Error reading synthesized audio for trimming: {e}")
+            return audio
+        
+        start, end = trim_bounds(pcm, 32768 * 10 ** (-self.TRIM_TOP_DB / 20))
+        if start == 0 and end == len(pcm):
+            return audio
+        return int16_wav_bytes(pcm[start:end], sample_rate)
+    
+    async def _recognize(self, audio_data: np.ndarray, language_code: str) -> SpeechRecognitionResult:
+        """Queue a chunk for batched speech recognition and wait for its result."""
+        future = asyncio.get_running_loop().create_future()
+        await self.processing_queue.put((audio_data, language_code, future))
+        
+        if self._batch_task is None or self._batch_task.done():
+            self._batch_task = asyncio.create_task(self._batch_worker())
+        
+        return await future
+    
+    async def _collect_batch(self, queue: asyncio.Queue) -> List[Tuple]:
+        """Wait for a request, then keep collecting until the batch is full or the wait window closes."""
+        loop = asyncio.get_running_loop()
+        pending = [await queue.get()]
+        
+        deadline = loop.time() + self.BATCH_MAX_WAIT
+        while len(pending) < self.BATCH_MAX_SIZE:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                pending.append(await asyncio.wait_for(queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return pending
+    
+    async def _batch_worker(self):
+        """Collect queued recognition requests into per-bucket batches and resolve their futures."""
+        loop = asyncio.get_running_loop()
+        inflight = asyncio.Semaphore(self.BATCH_MAX_INFLIGHT)
+        running = set()  # references to dispatched batches until they finish
+        # (duration bucket, language) -> (flush deadline, queued requests)
+        buckets: Dict[Tuple[int, str], Tuple[float, List[Tuple[np.ndarray, str, asyncio.Future]]]] = {}
+        while True:
+            # Wait for the next request, but no longer than the earliest bucket deadline
+            if not buckets:
+                item = await self.processing_queue.get()
+            else:
+                timeout = min(deadline for deadline, _ in buckets.values()) - loop.time()
+                try:
+                    item = await asyncio.wait_for(self.processing_queue.get(), max(timeout, 0.0))
+                except asyncio.TimeoutError:
+                    item = None
+            
+            if item is not None:
+                duration = len(item[0]) / settings.sample_rate
+                bucket = bisect.bisect(self.BATCH_BUCKET_EDGES, duration)
+                key = (bucket, item[1])
+                if key not in buckets:
+                    buckets[key] = (loop.time() + self.BATCH_BUCKET_WAITS[bucket], [])
+                buckets[key][1].append(item)
             
+            now = loop.time()
+            ready = [
+                key for key, (deadline, items) in buckets.items()
+                if len(items) >= self.BATCH_BUCKET_SIZES[key[0]] or deadline <= now
+            ]
+            for key in ready:
+                _, items = buckets.pop(key)
+                task = asyncio.create_task(self._dispatch_recognition_batch(inflight, items, key[1]))
+                running.add(task)
+                task.add_done_callback(running.discard)
+    
+    async def _dispatch_recognition_batch(self, inflight: asyncio.Semaphore,
+                                          items: List[Tuple[np.ndarray, str, asyncio.Future]], language_code: str):
+        """Run one flushed bucket once a decoding slot is free."""
+        async with inflight:
+            await self._run_recognition_batch(items, language_code)
+    
+    async def _run_recognition_batch(self, items: List[Tuple[np.ndarray, str, asyncio.Future]], language_code: str):
+        """Recognize one bucket of chunks and hand each result to its waiting request."""
+        try:
+            results = await self.speech_service.recognize_batch([item[0] for item in items], language_code)
         except Exception as e:
-            logger.error(f"Error processing audio chunk {request_id}: {e}")
-            return ProcessingResponse(
-                request_id=request_id,
-                status=ProcessingStatus.FAILED,
-                error_message=str(e),
-                processing_time=time.time() - start_time
-            )
+            logger.error(f"Error in batched speech recognition: {e}")
+            for _, _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for (_, _, future), result in zip(items, results):
+            # A request may have been cancelled while its batch was running
+            if not future.done():
+                future.set_result(result)
+    
+    async def _identify_speaker(self, audio_chunk: AudioChunk, session_id: str) -> Optional[str]:
+        """Queue a chunk for batched speaker identification and wait for its speaker id."""
+        future = asyncio.get_running_loop().create_future()
+        await self._speaker_queue.put((audio_chunk, session_id, future))
+        
+        if self._speaker_batch_task is None or self._speaker_batch_task.done():
+            self._speaker_batch_task = asyncio.create_task(self._speaker_batch_worker())
+        
+        return await future
+    
+    async def _speaker_batch_worker(self):
+        """Identify the speakers of concurrent chunks with one embedding extraction pass."""
+        while True:
+            pending = await self._collect_batch(self._speaker_queue)
+            chunks = [item[0] for item in pending]
+            
+            try:
+                # Feature extraction runs off the loop; matching updates the shared
+                # registry in chunk order, so it stays here
+                embeddings = await asyncio.to_thread(self.speaker_service.extract_speaker_embeddings, chunks)
+                speaker_ids = self.speaker_service.match_embeddings(
+                    embeddings, chunks, [item[1] for item in pending]
+                )
+            except Exception as e:
+                logger.error(f"Error in batched speaker identification: {e}")
+                speaker_ids = [None] * len(pending)
+            
+            for (_, _, future), speaker_id in zip(pending, speaker_ids):
+                if not future.done():
+                    future.set_result(speaker_id)
+    
+    def _voice_cache_key(self, job: _PipelineJob) -> Optional[Tuple[Optional[str], Optional[str]]]:
+        """Key of the job's speaker/actor pair in the session voice cache."""
+        return (job.speaker_id, job.actor_id) if job.speaker_id or job.actor_id else None
+    
+    async def _resolve_voice(self, job: _PipelineJob) -> Optional[str]:
+        """Voice to synthesize with, reusing the session's earlier choice for the speaker."""
+        cache_key = self._voice_cache_key(job)
+        cached = self._voice_cache.get(job.request.session_id, {}).get(cache_key) if cache_key else None
+        if cached is not None:
+            return cached[0]
+        
+        voice_id = None
+        
+        # Try to get best voice for actor if actor was identified
+        if job.actor_id:
+            voice_id = await self.voice_management.get_best_voice_for_actor(job.actor_id)
+        
+        # If no actor voice, try speaker's voice
+        speaker_profile = job.speaker_profile
+        if not voice_id and speaker_profile and speaker_profile.voice_clone_id:
+            voice_id = speaker_profile.voice_clone_id
+        
+        return voice_id
+    
+    def _remember_voice(self, job: _PipelineJob, voice_id: str):
+        """Record a voice the session synthesized with, counting repeat uses."""
+        cache_key = self._voice_cache_key(job)
+        if not cache_key:
+            return
+        session_voices = self._voice_cache.setdefault(job.request.session_id, {})
+        cached = session_voices.get(cache_key)
+        uses = cached[2] + 1 if cached is not None and cached[0] == voice_id else 1
+        session_voices[cache_key] = (voice_id, time.time(), uses)
+    
+    def invalidate_voices(self, speaker_id: Optional[str] = None, actor_id: Optional[str] = None):
+        """Drop cached voice choices involving the speaker or actor in every session."""
+        for session_voices in self._voice_cache.values():
+            stale = [key for key in session_voices
+                     if (speaker_id and key[0] == speaker_id) or (actor_id and key[1] == actor_id)]
+            for key in stale:
+                del session_voices[key]
+    
+    def _evict_voices(self, session_id: str):
+        """Trim a session's voice cache to the entries with the highest phi."""
+        session_voices = self._voice_cache.get(session_id)
+        if not session_voices or len(session_voices) <= self.VOICE_CACHE_SIZE:
+            return
+        
+        last_used = [entry[1] for entry in session_voices.values()]
+        oldest = min(last_used)
+        span = (max(last_used) - oldest) or 1.0
+        
+        def score(item: Tuple[Tuple[Optional[str], Optional[str]], Tuple[str, float, int]]) -> float:
+            _, (_, used_at, uses) = item
+            return uses * (1 + self.VOICE_RECENCY_WEIGHT * (used_at - oldest) / span)
+        
+        kept = sorted(session_voices.items(), key=score, reverse=True)[:self.VOICE_CACHE_SIZE]
+        self._voice_cache[session_id] = dict(kept)
     
     def _update_session_state(self, session_id: str, speaker_id: str, actor_id: Optional[str],
                             speech_result: SpeechRecognitionResult, 
                             translation_result: TranslationResult):
         """Update session state with processing results."""
         if session_id not in self.active_sessions:
+            # Occurrence counts per speaker/actor/language, so readers can rank by dominance
             self.active_sessions[session_id] = {
-                "speakers": set(),
-                "actors": set(),
-                "languages_detected": set(),
+                "speakers": Counter(),
+                "actors": Counter(),
+                "languages_detected": Counter(),
                 "processing_count": 0,
                 "created_at": time.time()
             }
         
         session = self.active_sessions[session_id]
         if speaker_id:
-            session["speakers"].add(speaker_id)
+            session["speakers"][speaker_id] += 1
         if actor_id:
-            session["actors"].add(actor_id)
-        session["languages_detected"].add(speech_result.language)
+            session["actors"][actor_id] += 1
+        session["languages_detected"][speech_result.language] += 1
         session["processing_count"] += 1
         session["last_activity"] = time.time()
+        self.active_sessions.move_to_end(session_id)
+        
+        self._evict_voices(session_id)
+        self._expire_sessions()
+    
+    def _expire_sessions(self):
+        """Drop idle sessions whose client never called cleanup_session."""
+        cutoff = time.time() - settings.session_ttl
+        while self.active_sessions:
+            session_id, session = next(iter(self.active_sessions.items()))
+            if session["last_activity"] >= cutoff and len(self.active_sessions) <= settings.max_active_sessions:
+                break
+            self.cleanup_session(session_id)
     
     def parse_audio_data(self, audio_data: bytes, format: AudioFormat = AudioFormat.WAV) -> AudioChunk:
         """Parse audio data from bytes into AudioChunk."""
+        # Imported here so streaming deployments that only pass arrays never load it
+        import soundfile as sf
+        
         try:
-            # Load audio using soundfile
-            audio_io = BytesIO(audio_data)
-            data, sample_rate = sf.read(audio_io)
-            
-            # Ensure mono audio
-            if len(data.shape) > 1:
-                data = np.mean(data, axis=1)
+            # Load audio using soundfile as mono float32 (what the feature pipelines expect).
+            # The downmix pass also finds the peak for normalizing.
+            with sf.SoundFile(BytesIO(audio_data)) as audio_file:
+                sample_rate = audio_file.samplerate
+                if audio_file.subtype == 'PCM_16' or audio_file.channels > 1:
+                    # 16-bit PCM is read as stored, so float conversion, downmix and
+                    # peak search take a single pass
+                    dtype, scale = (np.int16, 1.0 / 32768) if audio_file.subtype == 'PCM_16' else (np.float32, 1.0)
+                    shape = (audio_file.frames, audio_file.channels)
+                    n_bytes = shape[0] * shape[1] * np.dtype(dtype).itemsize
+                    scratch = self._take_scratch(n_bytes)
+                    try:
+                        samples = audio_file.read(out=scratch[:n_bytes].view(dtype).reshape(shape))
+                        data, peak = downmix_mono(samples, scale)
+                    finally:
+                        self._release_scratch(scratch)
+                else:
+                    data = audio_file.read(dtype='float32')
+                    peak = -1.0
             
-            # Resample if necessary
+            # Resample if necessary (this changes the peak, so it is rescanned). This is the
+            # soxr call librosa.resample makes by default, without librosa's import and checks.
             if sample_rate != settings.sample_rate:
-                data = librosa.resample(data, orig_sr=sample_rate, target_sr=settings.sample_rate)
+                import soxr
+                data = soxr.resample(data, sample_rate, settings.sample_rate, quality='HQ')
                 sample_rate = settings.sample_rate
+                peak = -1.0
             
-            # Normalize audio
-            if np.max(np.abs(data)) > 0:
-                data = data / np.max(np.abs(data))
+            # Normalize audio in place
+            data = peak_normalize(data, peak)
             
             return AudioChunk(
                 data=data,
                 sample_rate=sample_rate,
                 timestamp=time.time(),
-                chunk_id=str(uuid.uuid4()),
+                chunk_id=fast_request_id(),
                 format=format
             )
             
@@ -210,19 +627,26 @@ class AudioProcessingPipeline:
     def audio_chunk_to_bytes(self, audio_chunk: AudioChunk, format: AudioFormat = AudioFormat.WAV) -> bytes:
         """Convert AudioChunk back to bytes."""
         try:
-            output_io = BytesIO()
-            
-            # Convert to appropriate format
-            if format == AudioFormat.WAV:
-                sf.write(output_io, audio_chunk.data, audio_chunk.sample_rate, format='WAV')
-            elif format == AudioFormat.MP3:
-                # Note: soundfile doesn't support MP3 writing, would need additional library
-                sf.write(output_io, audio_chunk.data, audio_chunk.sample_rate, format='WAV')
-            else:
-                sf.write(output_io, audio_chunk.data, audio_chunk.sample_rate, format='WAV')
+            if format == AudioFormat.MP3:
+                try:
+                    from pydub import AudioSegment  # optional, and only needed for MP3
+                except ImportError:
+                    logger.warning("pydub is not installed, returning WAV instead of MP3")
+                else:
+                    data = audio_chunk.data
+                    segment = AudioSegment(
+                        data=pcm16_le(data),
+                        sample_width=2,
+                        frame_rate=audio_chunk.sample_rate,
+                        channels=1 if data.ndim == 1 else data.shape[1]
+                    )
+                    output_io = BytesIO()
+                    segment.export(output_io, format='mp3')
+                    return output_io.getvalue()
             
-            output_io.seek(0)
-            return output_io.read()
+            # WAV (and the fallback for other formats) is plain 16-bit PCM behind a
+            # fixed header - no need for libsndfile
+            return wav_bytes(audio_chunk.data, audio_chunk.sample_rate)
             
         except Exception as e:
             logger.error(f"Error converting audio chunk to bytes: {e}")
@@ -251,6 +675,9 @@ class AudioProcessingPipeline:
             # Update speaker profile with clone ID
             self.speaker_service.set_voice_clone_id(speaker_id, voice_id)
             
+            # Sessions that cached another voice for this speaker pick up the clone
+            self.invalidate_voices(speaker_id=speaker_id)
+            
             # If actor provided, associate with actor
             if actor_id:
                 await self.voice_management.add_voice_to_actor(actor_id, voice_id)
@@ -270,50 +697,59 @@ class AudioProcessingPipeline:
         if session:
             return {
                 "session_id": session_id,
-                "speakers": list(session["speakers"]),
-                "actors": list(session.get("actors", [])),
-                "languages_detected": list(session["languages_detected"]),
+                "speakers": self._most_common(session["speakers"]),
+                "actors": self._most_common(session.get("actors", Counter())),
+                "languages_detected": self._most_common(session["languages_detected"]),
                 "processing_count": session["processing_count"],
                 "created_at": session["created_at"],
                 "last_activity": session.get("last_activity", session["created_at"])
             }
         return None
     
+    @staticmethod
+    def _most_common(counts: Counter) -> List[str]:
+        """Keys of a session counter, most frequent first."""
+        return [key for key, _ in counts.most_common()]
+    
     def cleanup_session(self, session_id: str):
         """Clean up session data."""
+        self._voice_cache.pop(session_id, None)
+        self.speaker_service.reset_session(session_id)
         if session_id in self.active_sessions:
             del self.active_sessions[session_id]
             logger.info(f"Cleaned up session {session_id}")
     
-    def get_speaker_profiles(self, session_id: str) -> Dict:
+    async def get_speaker_profiles(self, session_id: str) -> Dict:
         """Get all speaker profiles for a session."""
         session = self.active_sessions.get(session_id)
         if not session:
             return {}
         
-        profiles = {}
+        speaker_profiles = {}
         for speaker_id in session["speakers"]:
             profile = self.speaker_service.get_speaker_profile(speaker_id)
             if profile:
-                # Get actor info if available
+                speaker_profiles[speaker_id] = profile
+        
+        # Look up all the speakers' actors concurrently
+        actor_profiles = await asyncio.gather(
+            *(self.voice_management.get_actor_for_speaker(speaker_id) for speaker_id in speaker_profiles),
+            return_exceptions=True
+        )
+        
+        profiles = {}
+        for (speaker_id, profile), actor_profile in zip(speaker_profiles.items(), actor_profiles):
+            if isinstance(actor_profile, Exception):
+                logger.error(f"Error getting actor for speaker {speaker_id}: {actor_profile}")
                 actor_profile = None
-                actor_task = asyncio.create_task(
-                    self.voice_management.get_actor_for_speaker(speaker_id)
-                )
-                try:
-                    # We need to run this synchronously since we're in a sync method
-                    loop = asyncio.get_event_loop()
-                    actor_profile = loop.run_until_complete(actor_task)
-                except Exception as e:
-                    logger.error(f"Error getting actor for speaker {speaker_id}: {e}")
-                
-                profiles[speaker_id] = {
-                    "speaker_id": profile.speaker_id,
-                    "confidence": profile.confidence,
-                    "voice_clone_id": profile.voice_clone_id,
-                    "characteristics": profile.characteristics or {},
-                    "actor_id": actor_profile.actor_id if actor_profile else None
-                }
+            
+            profiles[speaker_id] = {
+                "speaker_id": profile.speaker_id,
+                "confidence": profile.confidence,
+                "voice_clone_id": profile.voice_clone_id,
+                "characteristics": profile.characteristics or {},
+                "actor_id": actor_profile.actor_id if actor_profile else None
+            }
         
         return profiles
         
@@ -0,0 +1,14 @@
+import os
+import random
+
+# Request and chunk ids only correlate log lines and responses, so they come from a
+# PRNG seeded once from the OS instead of a urandom syscall per id (uuid.uuid4)
+_rng = random.Random(os.urandom(16))
+
+# Forked workers would otherwise continue the parent's sequence
+os.register_at_fork(after_in_child=lambda: _rng.seed(os.urandom(16)))
+
+
+def fast_request_id() -> str:
+    """Random 32-hex-digit id for internal correlation; not for anything security relevant."""
+    return _rng.randbytes(16).hex()
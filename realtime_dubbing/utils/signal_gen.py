@@ -0,0 +1,56 @@
+import numpy as np
+import numba
+from typing import Optional
+
+
+@numba.njit(cache=True, fastmath=True)
+def _add_tones(freqs, amps, sample_rate, out):
+    for k in range(freqs.size):
+        # sin((i+1)w) = 2cos(w)·sin(iw) - sin((i-1)w): one multiply-add per sample
+        # instead of a libm sin call
+        w = 2.0 * np.pi * freqs[k] / sample_rate
+        c = 2.0 * np.cos(w)
+        s_prev = -np.sin(w)
+        s_cur = 0.0
+        for i in range(out.size):
+            out[i] += amps[k] * s_cur
+            s_next = c * s_cur - s_prev
+            s_prev = s_cur
+            s_cur = s_next
+    return out
+
+
+def mix_tones(freqs, amps, sample_rate: int, n_samples: int, noise_sigma: float = 0.0,
+              rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """Sum of sines starting at phase 0 plus Gaussian noise, generated in place as float32.
+
+    Equivalent to `sum(a * np.sin(2 * np.pi * f * t)) + noise_sigma * rng.standard_normal(n_samples)`
+    with `t = np.arange(n_samples) / sample_rate`, but without building `t` or the per-term
+    temporaries: the noise is drawn straight into the output and the tones are added on top.
+    The oscillator state is kept in float64; only the samples are float32.
+    """
+    out = np.zeros(n_samples, dtype=np.float32)
+    if noise_sigma > 0.0:
+        rng = rng if rng is not None else np.random.default_rng()
+        rng.standard_normal(out=out, dtype=np.float32)
+        out *= noise_sigma
+    return _add_tones(
+        np.asarray(freqs, dtype=np.float64),
+        np.asarray(amps, dtype=np.float64),
+        float(sample_rate),
+        out
+    )
+
+
+def tone(freq: float, sample_rate: int, n_samples: int) -> np.ndarray:
+    """Unit-amplitude sine of `n_samples` samples at `freq` Hz."""
+    return mix_tones((freq,), (1.0,), sample_rate, n_samples)
+
+
+def pcm16_bytes(audio: np.ndarray) -> bytes:
+    """Raw 16-bit PCM bytes of a signal in [-1, 1], scaled by 32767 and truncated.
+
+    Scales in float32 so a float64 signal doesn't cost a full float64 temporary.
+    """
+    scaled = np.multiply(audio, 32767.0, dtype=np.float32)
+    return scaled.astype(np.int16).tobytes()
@@ -0,0 +1,43 @@
+import struct
+import numpy as np
+
+# RIFF/WAVE header for uncompressed PCM: chunk ids, sizes and the 16-byte fmt chunk
+_WAV_HEADER = struct.Struct("<4sI4s4sIHHIIHH4sI")
+
+
+def pcm16_le(data: np.ndarray) -> bytes:
+    """Raw little-endian 16-bit PCM samples for a float signal in [-1, 1]."""
+    # Scaling by a power of two is exact in the input's float precision, so flooring
+    # gives the same samples libsndfile writes
+    scaled = np.multiply(data, 32768.0, dtype=np.result_type(data.dtype, np.float32))
+    np.floor(scaled, out=scaled)
+    np.clip(scaled, -32768.0, 32767.0, out=scaled)
+    return scaled.astype("<i2").tobytes()
+
+
+def wav_bytes(data: np.ndarray, sample_rate: int) -> bytes:
+    """16-bit PCM WAV file bytes for a float signal in [-1, 1].
+
+    `data` is mono (samples,) or interleaved (samples, channels). Produces the same
+    bytes soundfile writes for format='WAV' (PCM_16), but packs the 44-byte header
+    directly instead of going through libsndfile and a BytesIO.
+    """
+    n_channels = 1 if data.ndim == 1 else data.shape[1]
+    return _wav_file(pcm16_le(data), n_channels, sample_rate)
+
+
+def int16_wav_bytes(pcm: np.ndarray, sample_rate: int) -> bytes:
+    """16-bit PCM WAV file bytes for int16 samples, mono or (samples, channels)."""
+    n_channels = 1 if pcm.ndim == 1 else pcm.shape[1]
+    return _wav_file(pcm.astype("<i2", copy=False).tobytes(), n_channels, sample_rate)
+
+
+def _wav_file(pcm: bytes, n_channels: int, sample_rate: int) -> bytes:
+    """Prepend the 44-byte WAV header to raw 16-bit PCM bytes."""
+    block_align = 2 * n_channels
+    header = _WAV_HEADER.pack(
+        b"RIFF", 36 + len(pcm), b"WAVE",
+        b"fmt ", 16, 1, n_channels, sample_rate, sample_rate * block_align, block_align, 16,
+        b"data", len(pcm)
+    )
+    return header + pcm
@@ -2,108 +2,152 @@
 """
 Validation script for Local Whisper migration
 Tests that our code changes are syntactically correct and imports work
+
+Modules other than the settings are only located and compiled, not imported, so
+the check doesn't load Whisper/torch. Pass --full to import the service as well.
 """
 
 import sys
 import os
+import importlib.util
+import py_compile
+
+# Put the project directory (this script's) first on sys.path, once
+_project_dir = os.path.dirname(os.path.abspath(__file__))
+if _project_dir not in sys.path:
+    sys.path.insert(0, _project_dir)
+
+def _has_openai_key(settings):
+    """Whether settings still declares openai_api_key, as a field lookup rather than hasattr."""
+    return 'openai_api_key' in getattr(type(settings), 'model_fields', vars(settings))
+
+def _emit(lines):
+    """Write the buffered lines with a single stdout write and clear the buffer."""
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
+        lines.clear()
 
-# Add the project path to sys.path
-sys.path.append('/workspace/code/realtime_dubbing')
+def _validate(module_name):
+    """Locate a module and compile its source without importing (executing) it."""
+    spec = importlib.util.find_spec(module_name)
+    if spec is None or spec.origin is None:
+        raise ImportError(f"No module named '{module_name}'", name=module_name)
+    py_compile.compile(spec.origin, doraise=True)
 
-def test_imports():
-    """Test that our updated modules can be imported successfully."""
-    print("🔍 Testing module imports...")
+def test_imports(full_import=False):
+    """Test that our updated modules can be imported successfully.
+    
+    Returns (result, settings); settings is None if the config import failed.
+    """
+    settings = None
+    log = ["🔍 Testing module imports..."]
     
     try:
         # Test configuration imports
-        print("   ✓ Testing config imports...")
+        log.append("   ✓ Testing config imports...")
         from config.settings import settings
-        print(f"   ✓ Whisper model setting: {settings.whisper_model}")
+        log.append(f"   ✓ Whisper model setting: {settings.whisper_model}")
         
         # Test that openai_api_key is no longer required
-        if hasattr(settings, 'openai_api_key'):
-            print("   ⚠️  openai_api_key still exists in settings (should be removed)")
+        if _has_openai_key(settings):
+            log.append("   ⚠️  openai_api_key still exists in settings (should be removed)")
         else:
-            print("   ✅ openai_api_key successfully removed from settings")
+            log.append("   ✅ openai_api_key successfully removed from settings")
         
         # Test model imports
-        print("   ✓ Testing model imports...")
-        from models.audio_models import SpeechRecognitionResult, TranslationResult
+        log.append("   ✓ Testing model imports...")
+        _validate("models.audio_models")
         
         # Test that our service can be imported (even if we can't run it yet)
-        print("   ✓ Testing service imports...")
-        try:
-            from services.whisper_speech_service import WhisperSpeechService, WhisperTranslateService
-            print("   ✅ WhisperSpeechService and WhisperTranslateService imported successfully")
-        except ImportError as e:
-            if "whisper" in str(e).lower():
-                print("   ⏳ Whisper library not yet installed (dependencies still downloading)")
-                return "partial"
-            else:
-                raise e
+        log.append("   ✓ Testing service imports...")
+        if full_import:
+            try:
+                from services.whisper_speech_service import WhisperSpeechService, WhisperTranslateService
+                log.append("   ✅ WhisperSpeechService and WhisperTranslateService imported successfully")
+            except ImportError as e:
+                if e.name and e.name.split('.')[0] == "whisper":
+                    log.append("   ⏳ Whisper library not yet installed (dependencies still downloading)")
+                    return "partial", settings
+                raise
+        else:
+            _validate("services.whisper_speech_service")
+            if importlib.util.find_spec("whisper") is None:
+                log.append("   ⏳ Whisper library not yet installed (dependencies still downloading)")
+                return "partial", settings
+            log.append("   ✅ whisper_speech_service compiles and the whisper library is installed")
         
-        print("\n✅ All imports successful!")
-        return "success"
+        log.append("\n✅ All imports successful!")
+        return "success", settings
         
     except Exception as e:
-        print(f"\n❌ Import test failed: {e}")
+        log.append(f"\n❌ Import test failed: {e}")
+        _emit(log)  # ahead of the traceback, which goes to stderr
         import traceback
         traceback.print_exc()
-        return "failed"
+        return "failed", settings
+    finally:
+        _emit(log)
 
-def test_configuration():
-    """Test that configuration changes are correct."""
-    print("\n🔧 Testing configuration changes...")
+def test_configuration(settings):
+    """Test that configuration changes are correct, given the settings test_imports loaded."""
+    log = ["\n🔧 Testing configuration changes..."]
+    
+    if settings is None:
+        log.append("\n❌ Configuration test failed: settings could not be imported")
+        _emit(log)
+        return False
     
     try:
-        from config.settings import settings
-        
         # Check whisper model setting
         expected_model = "base"
         if settings.whisper_model == expected_model:
-            print(f"   ✅ Whisper model correctly set to: {settings.whisper_model}")
+            log.append(f"   ✅ Whisper model correctly set to: {settings.whisper_model}")
         else:
-            print(f"   ⚠️  Whisper model is: {settings.whisper_model}, expected: {expected_model}")
+            log.append(f"   ⚠️  Whisper model is: {settings.whisper_model}, expected: {expected_model}")
         
         # Check that API key dependency is removed
-        if hasattr(settings, 'openai_api_key'):
-            print("   ⚠️  OpenAI API key dependency still exists")
+        if _has_openai_key(settings):
+            log.append("   ⚠️  OpenAI API key dependency still exists")
         else:
-            print("   ✅ OpenAI API key dependency successfully removed")
+            log.append("   ✅ OpenAI API key dependency successfully removed")
             
-        print("\n✅ Configuration tests passed!")
+        log.append("\n✅ Configuration tests passed!")
         return True
         
     except Exception as e:
-        print(f"\n❌ Configuration test failed: {e}")
+        log.append(f"\n❌ Configuration test failed: {e}")
         return False
+    finally:
+        _emit(log)
 
 def main():
     """Run all validation tests."""
-    print("🎯 VALIDATION: Local Whisper Migration")
-    print("=" * 50)
+    _emit(["🎯 VALIDATION: Local Whisper Migration", "=" * 50])
     
     # Test imports
-    import_result = test_imports()
+    import_result, settings = test_imports(full_import="--full" in sys.argv[1:])
     
     # Test configuration
-    config_result = test_configuration()
+    config_result = test_configuration(settings)
     
     # Summary
-    print("\n📊 VALIDATION SUMMARY:")
-    print(f"   Imports: {import_result}")
-    print(f"   Configuration: {'✅ PASS' if config_result else '❌ FAIL'}")
+    log = ["\n📊 VALIDATION SUMMARY:"]
+    log.append(f"   Imports: {import_result}")
+    log.append(f"   Configuration: {'✅ PASS' if config_result else '❌ FAIL'}")
     
     if import_result in ["success", "partial"] and config_result:
-        print("\n🎉 MIGRATION VALIDATION: SUCCESS!")
-        print("\n💡 Next Steps:")
-        print("   1. Wait for dependencies to finish installing")
-        print("   2. Run full integration test")
-        print("   3. Test with real audio data")
-        return True
+        log.append("\n🎉 MIGRATION VALIDATION: SUCCESS!")
+        log.append("\n💡 Next Steps:")
+        log.append("   1. Wait for dependencies to finish installing")
+        log.append("   2. Run full integration test")
+        log.append("   3. Test with real audio data")
+        success = True
     else:
-        print("\n💔 VALIDATION: Issues found that need attention")
-        return False
+        log.append("\n💔 VALIDATION: Issues found that need attention")
+        success = False
+    
+    _emit(log)
+    return success
 
 if __name__ == "__main__":
     success = main()